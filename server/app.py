@@ -3,6 +3,9 @@ from flask_cors import CORS
 from dotenv import load_dotenv
 from routes import register_blueprints
 from config import Config
+from extensions.json_provider import OrjsonProvider
+from extensions.llm import init_llm
+from services.munro_service import all_munros_json, tag_counts_json
 import os
 
 
@@ -13,14 +16,24 @@ def create_app() -> Flask:
     load_dotenv()
     app = Flask(__name__)
     app.config.from_object(Config)
-    app.config["JSON_AS_ASCII"] = False
+
+    # orjson emits UTF-8 bytes directly, so jsonify no longer needs ASCII escaping.
+    app.json = OrjsonProvider(app)
 
     # Enable CORS for the single-page client.
     CORS(app)
 
+    # Construct the chat model up front so misconfiguration shows in the boot log.
+    init_llm(app)
+
     # Register blueprints, database teardown hooks, etc.
     register_blueprints(app)
 
+    # Serialise the full Munro list and tag counts once so the default reads are a memcpy.
+    with app.app_context():
+        all_munros_json()
+        tag_counts_json()
+
     # Provide a visible boot log for container platforms.
     print("🚀 Starting Munro Flask API...")
 
@@ -5,5 +5,16 @@ class Config:
     """Default configuration values for the Flask application."""
 
     DB_PATH = os.getenv("DB_PATH", "db.sqlite")
+    CACHE_DB_PATH = os.getenv("CACHE_DB_PATH", "cache.sqlite")
+    # Seconds a memoised chat reply / broad LLM pick stays valid.
+    CHAT_CACHE_TTL = int(os.getenv("CHAT_CACHE_TTL", "3600"))
+    # Opt-in: reuse replies for paraphrased messages (one embedding call per chat).
+    CHAT_SEMANTIC_CACHE = os.getenv("CHAT_SEMANTIC_CACHE", "").lower() in ("1", "true", "yes")
+    CHAT_SEMANTIC_THRESHOLD = float(os.getenv("CHAT_SEMANTIC_THRESHOLD", "0.92"))
+    # Opt-in: coalesce concurrent intent calls into one LLM request (helps under load only).
+    CHAT_INTENT_BATCH = os.getenv("CHAT_INTENT_BATCH", "").lower() in ("1", "true", "yes")
+    CHAT_INTENT_BATCH_SIZE = int(os.getenv("CHAT_INTENT_BATCH_SIZE", "8"))
+    CHAT_INTENT_BATCH_WAIT_MS = int(os.getenv("CHAT_INTENT_BATCH_WAIT_MS", "20"))
+    MUNRO_EMBED_MODEL = os.getenv("MUNRO_EMBED_MODEL", "text-embedding-3-small")
     MUNRO_CHAT_MODEL = os.getenv("MUNRO_CHAT_MODEL", "gpt-4o-mini")
     OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
@@ -1,28 +1,184 @@
+import os
 import sqlite3
-from flask import current_app, g
+import threading
+from typing import Tuple
+from flask import current_app
+
+# One long-lived connection per worker thread so SQLite's page cache stays warm.
+_local = threading.local()
+
+# Applied once when a thread's connection is first opened.
+_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-64000",
+    "PRAGMA mmap_size=268435456",
+)
+
+# Compiled statements kept per connection; the search templates alone have many shapes.
+_STATEMENT_CACHE = 256
+
+# Side database for memoised LLM output. Kept out of DB_PATH so cache writes never
+# move catalog_version() and flush the catalog-derived caches.
+_LLM_CACHE_DDL = """
+    CREATE TABLE IF NOT EXISTS llm_cache (
+        key        TEXT PRIMARY KEY,
+        payload    BLOB NOT NULL,
+        created_at REAL NOT NULL
+    )
+"""
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    """Open a SQLite connection with row factory and server pragmas applied."""
+
+    conn = sqlite3.connect(path, cached_statements=_STATEMENT_CACHE)
+    conn.row_factory = sqlite3.Row
+    for pragma in _PRAGMAS:
+        conn.execute(pragma)
+    return conn
 
 
 def get_db():
-    """Return a request-scoped SQLite connection with row factory configured."""
+    """Return this thread's persistent SQLite connection, opening it lazily."""
+
+    path = current_app.config["DB_PATH"]
+    conn = getattr(_local, "conn", None)
+    if conn is None or _local.path != path:
+        if conn is not None:
+            conn.close()
+        conn = _connect(path)
+        _local.conn = conn
+        _local.path = path
+    return conn
+
+
+def get_cache_db():
+    """Return this thread's connection to the LLM cache database, creating it lazily."""
+
+    path = current_app.config["CACHE_DB_PATH"]
+    conn = getattr(_local, "cache_conn", None)
+    if conn is None or _local.cache_path != path:
+        if conn is not None:
+            conn.close()
+        conn = _connect(path)
+        conn.execute(_LLM_CACHE_DDL)
+        _local.cache_conn = conn
+        _local.cache_path = path
+    return conn
+
+
+def catalog_version() -> Tuple[float, float]:
+    """Return a cheap change marker for the database (file + WAL mtimes)."""
+
+    path = current_app.config["DB_PATH"]
+    wal = f"{path}-wal"
+    return (
+        os.path.getmtime(path) if os.path.exists(path) else 0.0,
+        os.path.getmtime(wal) if os.path.exists(wal) else 0.0,
+    )
 
-    if "db_conn" not in g:
-        path = current_app.config["DB_PATH"]
-        conn = sqlite3.connect(path)
-        conn.row_factory = sqlite3.Row
-        g.db_conn = conn
-    return g.db_conn
+
+# Derived objects ensure_schema maintains; when all exist, boot needs no writes.
+_DERIVED_OBJECTS = frozenset({
+    "munro_trigram", "idx_munros_name", "idx_munros_grade_bog", "idx_munros_bog",
+    "idx_munros_name_nocase", "munro_summary",
+})
+
+
+def _schema_names(conn: sqlite3.Connection) -> set:
+    """Return the names of every table, index and view in the database."""
+
+    return {r[0] for r in conn.execute("SELECT name FROM sqlite_master")}
+
+
+def ensure_schema(conn: sqlite3.Connection) -> None:
+    """Create derived search structures that are rebuilt from ``munros``."""
+
+    names = _schema_names(conn)
+    if "munros" not in names:
+        return
+    wanted = set(_DERIVED_OBJECTS)
+    if "munro_tags" in names:
+        wanted.add("idx_munro_tags_tag_munro")
+    if "munro_coords" in names:
+        wanted.add("munro_rtree")
+    if wanted <= names and "sqlite_stat1" in names:
+        return  # already built (the usual worker boot): stay read-only
+
+    # Several workers may boot at once: take the write lock up front (busy_timeout
+    # waits for it) and re-check inside, so only one of them builds anything.
+    conn.execute("BEGIN IMMEDIATE")
+    names = _schema_names(conn)
+
+    # Trigram index backing substring search; seed.py drops it when reseeding.
+    if "munro_trigram" not in names:
+        conn.execute("""
+            CREATE VIRTUAL TABLE munro_trigram USING fts5(
+              name, summary, description,
+              content='munros', content_rowid='id', tokenize='trigram'
+            )
+        """)
+        conn.execute("INSERT INTO munro_trigram(munro_trigram) VALUES ('rebuild')")
+
+    # Point R-Tree for nearest-Munro lookups (degenerate boxes keyed by munro_coords.rowid);
+    # seed.py drops it too. munro_coords.build_or_update_coords keeps it in sync afterwards.
+    if "munro_coords" in names and "munro_rtree" not in names:
+        conn.execute(
+            "CREATE VIRTUAL TABLE munro_rtree USING rtree(id, minLat, maxLat, minLon, maxLon)"
+        )
+        conn.execute(
+            "INSERT INTO munro_rtree (id, minLat, maxLat, minLon, maxLon) "
+            "SELECT rowid, lat, lat, lon, lon FROM munro_coords"
+        )
+
+    # Filter indexes: grade equality + bog range on /api/munros, tag -> munro for include_tags.
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_munros_name ON munros(name)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_munros_grade_bog ON munros(grade, bog)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_munros_bog ON munros(bog)")
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_munros_name_nocase ON munros(name COLLATE NOCASE)"
+    )
+    if "munro_tags" in names:
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_munro_tags_tag_munro ON munro_tags(tag, munro_id)"
+        )
+
+    # Per-Munro tag rollup for the broad chat fallback.
+    conn.execute("""
+        CREATE VIEW IF NOT EXISTS munro_summary AS
+        SELECT m.id, m.name, m.summary, m.terrain, m.public_transport, m.start,
+               COALESCE(
+                 (SELECT GROUP_CONCAT(t.tag, ', ') FROM munro_tags t WHERE t.munro_id = m.id),
+                 ''
+               ) AS tags
+        FROM munros m
+    """)
+    changed = _schema_names(conn) != names
+    conn.commit()
+
+    # Refresh planner statistics (sqlite_stat1) only after a seed or schema change.
+    if changed or "sqlite_stat1" not in names:
+        conn.execute("ANALYZE")
 
 
 def close_db(e=None):
-    """Close the request-scoped database connection if it was opened."""
+    """Release any open transaction; the connection itself is kept for reuse."""
 
-    conn = g.pop("db_conn", None)
-    if conn is not None:
-        conn.close()
+    for attr in ("conn", "cache_conn"):
+        conn = getattr(_local, attr, None)
+        if conn is not None and conn.in_transaction:
+            conn.rollback()
 
 
 # Optional: register teardown in app factory if you prefer
 def init_app(app):
-    """Attach the database teardown handler to the Flask application."""
+    """Attach the database teardown handler and ensure derived search tables."""
 
     app.teardown_appcontext(close_db)
+
+    # Build any missing derived tables once at boot rather than on first request.
+    with app.app_context():
+        ensure_schema(get_db())
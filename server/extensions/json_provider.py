@@ -0,0 +1,39 @@
+import sqlite3
+from typing import Any
+import orjson
+from flask import Response
+from flask.json.provider import DefaultJSONProvider
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider that serialises responses with orjson instead of stdlib json."""
+
+    mimetype = "application/json; charset=utf-8"
+
+    # int keys (e.g. id -> tags maps) and numpy scalars/arrays from the geo code.
+    options = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+    @staticmethod
+    def default(o: Any) -> Any:
+        """Fall back for types orjson can't encode natively."""
+
+        if isinstance(o, sqlite3.Row):
+            return dict(o)
+        return DefaultJSONProvider.default(o)
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        """Serialise ``obj`` to a UTF-8 string (used by ``flask.json.dumps``)."""
+
+        return orjson.dumps(obj, default=self.default, option=self.options).decode("utf-8")
+
+    def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+        """Parse JSON with orjson (also backs ``request.get_json``)."""
+
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+        """Build a response from orjson bytes, skipping the str round-trip."""
+
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=self.default, option=self.options)
+        return self._app.response_class(body, mimetype=self.mimetype)
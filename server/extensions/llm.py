@@ -1,31 +1,78 @@
-from typing import Optional
-from flask import current_app
-import os
+from flask import Flask, current_app
 
-# Lazily load to avoid import errors when not configured
-_llm = None
-_use_llm = None
 
+def init_llm(app: Flask) -> None:
+    """Build the LangChain ChatOpenAI client once and store it on ``app.extensions``."""
 
-def get_llm():
-    """Return a cached LangChain ChatOpenAI instance and flag if it is usable."""
-
-    global _llm, _use_llm
-    if _use_llm is not None:
-        return _llm, _use_llm
+    # Configuration is resolved from Config (which already reads the environment).
+    key = app.config.get("OPENAI_API_KEY")
+    if not key:
+        app.logger.warning("OPENAI_API_KEY not set; LLM-backed chat is disabled")
+        app.extensions["llm"] = app.extensions["llm_json"] = None
+        app.extensions["semantic_cache"] = app.extensions["llm_batcher"] = None
+        return
 
     try:
         from langchain_openai import ChatOpenAI  # type: ignore
+    except ImportError:
+        app.logger.warning("langchain_openai not installed; LLM-backed chat is disabled")
+        app.extensions["llm"] = app.extensions["llm_json"] = None
+        app.extensions["semantic_cache"] = app.extensions["llm_batcher"] = None
+        return
+
+    # Zero temperature keeps answers deterministic for the assistant persona.
+    llm = ChatOpenAI(
+        model=app.config.get("MUNRO_CHAT_MODEL", "gpt-4o-mini"),
+        temperature=0,
+        openai_api_key=key,
+    )
+    app.extensions["llm"] = llm
+    # JSON mode for the structured calls (intent, broad pick): replies are always a
+    # single JSON object, so parsing never has to dig it out of prose.
+    app.extensions["llm_json"] = llm.bind(response_format={"type": "json_object"})
+
+    app.extensions["llm_batcher"] = None
+    if app.config.get("CHAT_INTENT_BATCH"):
+        from services.llm_batcher import JSONBatcher
+
+        app.extensions["llm_batcher"] = JSONBatcher(
+            app.extensions["llm_json"],
+            app.config.get("MUNRO_CHAT_MODEL", "gpt-4o-mini"),
+            max_batch=app.config.get("CHAT_INTENT_BATCH_SIZE", 8),
+            max_wait=app.config.get("CHAT_INTENT_BATCH_WAIT_MS", 20) / 1000,
+        )
+
+    app.extensions["semantic_cache"] = None
+    if app.config.get("CHAT_SEMANTIC_CACHE"):
+        # Imported only when enabled: numpy stays off the default import path.
+        from langchain_openai import OpenAIEmbeddings  # type: ignore
+        from services.semantic_cache import SemanticCache
+
+        embedder = OpenAIEmbeddings(
+            model=app.config.get("MUNRO_EMBED_MODEL", "text-embedding-3-small"),
+            openai_api_key=key,
+        )
+        app.extensions["semantic_cache"] = SemanticCache(
+            embedder.embed_query,
+            threshold=app.config.get("CHAT_SEMANTIC_THRESHOLD", 0.92),
+            ttl=app.config.get("CHAT_CACHE_TTL", 3600),
+        )
+
+
+def get_llm():
+    """Return the app's ChatOpenAI instance and whether LLM flows are usable."""
+
+    llm = current_app.extensions.get("llm")
+    return llm, llm is not None
+
+
+def get_llm_batcher():
+    """Return the intent-call batcher, or ``None`` unless batching is enabled."""
+
+    return current_app.extensions.get("llm_batcher")
+
+
+def get_json_llm():
+    """Return the JSON-mode variant of the app's LLM, or ``None`` when disabled."""
 
-        # Pull configuration from Flask first, then fall back to environment.
-        model = current_app.config.get("MUNRO_CHAT_MODEL", "gpt-4o-mini")
-        key = current_app.config.get("OPENAI_API_KEY") or os.getenv("OPENAI_API_KEY")
-
-        # Zero temperature keeps answers deterministic for the assistant persona.
-        _llm = ChatOpenAI(model=model, temperature=0, openai_api_key=key)
-        _use_llm = True
-    except Exception:
-        # If the dependency is missing or credentials aren't present, disable LLM flows.
-        _llm = None
-        _use_llm = False
-    return _llm, _use_llm
+    return current_app.extensions.get("llm_json")
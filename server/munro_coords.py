@@ -1,19 +1,27 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
+import json
+import math
 import os
 import re
 import sqlite3
+import sys
 import time
-from datetime import datetime
-from typing import Optional, Tuple, List
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple, List
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from threading import Lock
+from queue import Empty, SimpleQueue
+from threading import Lock, local
 
-import numpy as np
-import pandas as pd
 from geopy.geocoders import Nominatim
 from geopy.extra.rate_limiter import RateLimiter
 
+# numpy/pandas are imported where used: the web app only needs numpy on the
+# nearest-Munro path and pandas never, so importing this module stays cheap.
+if TYPE_CHECKING:
+    import pandas as pd
+
 # Optional Overpass fallback
 try:
     import overpy
@@ -26,10 +34,21 @@ except Exception:
 
 DB_PATH = os.environ.get("MUNRO_DB", "db.sqlite")
 JSON_PATH = os.environ.get("MUNRO_JSON", "munro_descriptions.json")
+# Geocode cache lives beside, not inside, the catalog DB (see db.get_cache_db).
+# Same variable as Config.CACHE_DB_PATH, so both caches always share one file.
+CACHE_DB_PATH = os.environ.get("CACHE_DB_PATH", "cache.sqlite")
 
 # Bounding box for Scotland (south, west, north, east)
 SCOTLAND_BBOX = (54.5, -8.5, 60.9, -0.5)
 
+# Nominatim filters for hill lookups: GB only, results bounded to the Scotland box,
+# so cross-border namesakes are dropped server-side.
+SCOTLAND_GEOCODE_PARAMS = {
+    "country_codes": "gb",
+    "viewbox": (SCOTLAND_BBOX[:2], SCOTLAND_BBOX[2:]),
+    "bounded": True,
+}
+
 # Respectful values; you can tweak max workers if you have your own Nominatim or are okay with slower fallback
 MAX_WORKERS = int(os.environ.get("MUNRO_GEOCODE_WORKERS", "3"))
 
@@ -37,22 +56,99 @@ NOMINATIM_USER_AGENT = os.environ.get(
     "NOMINATIM_UA", "munro-coords-app (contact@example.com)"
 )
 
-_print_lock = Lock()  # keep logs tidy across threads
+# Cached geocodes: hits rarely move, misses (dead variants) are retried sooner.
+GEOCODE_TTL = timedelta(days=30)
+GEOCODE_MISS_TTL = timedelta(days=1)
+
+# Workers queue progress lines; the main thread writes them out in batches.
+_log_q: SimpleQueue = SimpleQueue()
+_LOG_BATCH = 10
+
+# Process-wide (client, limiter) pair, built on first use.
+_geocoder = None
+_geocoder_lock = Lock()
+_WS_RE = re.compile(r"\s+")
+# sanitize_name: trailing bracketed qualifier, then a trailing ", Region" segment.
+_PAREN_RE = re.compile(r"\s*\([^)]*\)\s*$")
+_COMMA_RE = re.compile(r",\s*[^,]+$")
+_cache_schema_ready = False
+
+# Initial search radius for nearest_munros_to_point's R-Tree prefilter.
+NEAREST_RADIUS_KM = 50.0
+EARTH_RADIUS_KM = 6371.0088
+
+_NEAREST_BOX_SQL = """
+    SELECT c.name, c.lat, c.lon
+    FROM munro_rtree r
+    JOIN munro_coords c ON c.rowid = r.id
+    WHERE r.maxLat >= ? AND r.minLat <= ? AND r.maxLon >= ? AND r.minLon <= ?
+"""
 
 # ------------------------- DB helpers -------------------------
 
 
-def _ensure_conn() -> sqlite3.Connection:
-    """Open a SQLite connection with performance-friendly pragmas."""
+_conn_local = local()
+
+# Applied once when a thread's connection is first opened (mirrors db._PRAGMAS).
+_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA cache_size=-20000",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA foreign_keys=ON",
+)
+
 
-    conn = sqlite3.connect(DB_PATH)
-    conn.execute("PRAGMA journal_mode=WAL;")
-    conn.execute("PRAGMA synchronous=NORMAL;")
+def _ensure_conn(path: Optional[str] = None) -> sqlite3.Connection:
+    """Return this thread's connection to ``path`` (default DB_PATH), opening it on first use."""
+
+    path = path or DB_PATH
+    conns = getattr(_conn_local, "conns", None)
+    if conns is None:
+        conns = _conn_local.conns = {}
+    conn = conns.get(path)
+    if conn is None:
+        conn = sqlite3.connect(path)
+        for pragma in _PRAGMAS:
+            conn.execute(pragma)
+        conns[path] = conn
     return conn
 
 
+def _cache_conn() -> sqlite3.Connection:
+    """Return this thread's geocode cache connection, creating the table once."""
+
+    global _cache_schema_ready
+    conn = _ensure_conn(CACHE_DB_PATH)
+    if not _cache_schema_ready:
+        # lat/lon are NULL for cached misses.
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS geocode_cache (
+                query  TEXT PRIMARY KEY,
+                lat    REAL,
+                lon    REAL,
+                hit_at TEXT NOT NULL
+            )
+        """)
+        conn.commit()
+        _cache_schema_ready = True
+    return conn
+
+
+def _sync_rtree(conn: sqlite3.Connection) -> None:
+    """Rebuild the point R-Tree from munro_coords (a few hundred rows)."""
+
+    conn.execute("DELETE FROM munro_rtree")
+    conn.execute(
+        "INSERT INTO munro_rtree (id, minLat, maxLat, minLon, maxLon) "
+        "SELECT rowid, lat, lat, lon, lon FROM munro_coords"
+    )
+
+
 def _ensure_schema(conn: sqlite3.Connection) -> None:
-    """Create the coordinate table if it is missing."""
+    """Create the coordinate table and its R-Tree if they are missing."""
 
     conn.execute("""
         CREATE TABLE IF NOT EXISTS munro_coords (
@@ -66,6 +162,14 @@ def _ensure_schema(conn: sqlite3.Connection) -> None:
     conn.execute(
         "CREATE INDEX IF NOT EXISTS idx_munro_coords_latlon ON munro_coords(lat, lon)"
     )
+    # Points stored as degenerate boxes, keyed by munro_coords.rowid.
+    conn.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS munro_rtree "
+        "USING rtree(id, minLat, maxLat, minLon, maxLon)"
+    )
+    n_tree = conn.execute("SELECT COUNT(*) FROM munro_rtree").fetchone()[0]
+    if n_tree != conn.execute("SELECT COUNT(*) FROM munro_coords").fetchone()[0]:
+        _sync_rtree(conn)
     conn.commit()
 
 
@@ -81,40 +185,33 @@ def load_munro_names(source: str = "auto") -> List[str]:
         src = "sqlite" if os.path.exists(DB_PATH) else "json"
 
     if src == "json":
-        df = pd.read_json(JSON_PATH, orient="records")
-        if "name" not in df.columns:
+        with open(JSON_PATH, encoding="utf-8") as f:
+            data = json.load(f)
+        if not any("name" in r for r in data):
             raise ValueError("JSON must contain a 'name' field for each munro.")
-        names = df["name"].dropna().astype(str).str.strip().tolist()
+        names = [str(r["name"]).strip() for r in data if r.get("name") is not None]
 
     elif src == "sqlite":
         conn = _ensure_conn()
-        try:
-            for table in ("munros", "munro_descriptions", "munro"):
-                try:
-                    df = pd.read_sql_query(f"SELECT name FROM {table}", conn)
-                    if "name" in df.columns and len(df):
-                        names.extend(
-                            df["name"].dropna().astype(str).str.strip().tolist()
-                        )
-                        break
-                except Exception:
-                    continue
-            if not names:
-                raise ValueError(
-                    "Could not find a table with a 'name' column (tried munros/munro_descriptions/munro)."
-                )
-        finally:
-            conn.close()
+        for table in ("munros", "munro_descriptions", "munro"):
+            try:
+                rows = conn.execute(
+                    f"SELECT name FROM {table} WHERE name IS NOT NULL"
+                ).fetchall()
+            except sqlite3.Error:
+                continue
+            if rows:
+                names.extend(str(r[0]).strip() for r in rows)
+                break
+        if not names:
+            raise ValueError(
+                "Could not find a table with a 'name' column (tried munros/munro_descriptions/munro)."
+            )
     else:
         raise ValueError("source must be 'json', 'sqlite', or 'auto'.")
 
-    # de-dupe preserve order
-    seen, ordered = set(), []
-    for n in names:
-        if n and n not in seen:
-            seen.add(n)
-            ordered.append(n)
-    return ordered
+    # de-dupe preserve order (dicts keep insertion order)
+    return list(dict.fromkeys(n for n in names if n))
 
 
 # ------------------------- Helpers -------------------------
@@ -131,9 +228,9 @@ def sanitize_name(name: str) -> str:
     """Strip common suffixes/qualifiers from a hill name before geocoding."""
 
     # remove bracketed region qualifiers, e.g. "Stob Binnein (Loch Lomond)"
-    base = re.sub(r"\s*\([^)]*\)\s*$", "", name).strip()
+    base = _PAREN_RE.sub("", name).strip()
     # remove trailing comma segments like ", Skye"
-    base = re.sub(r",\s*[^,]+$", "", base).strip()
+    base = _COMMA_RE.sub("", base).strip()
     return base or name.strip()
 
 
@@ -141,18 +238,77 @@ def sanitize_name(name: str) -> str:
 
 
 def _nominatim_geocoder():
-    """Construct a Nominatim client with a rate-limited geocode helper."""
+    """Return the shared Nominatim client and its rate-limited geocode helper."""
+
+    global _geocoder
+    if _geocoder is None:
+        with _geocoder_lock:
+            if _geocoder is None:
+                # geopy's default adapter keeps a pooled keep-alive session.
+                g = Nominatim(user_agent=NOMINATIM_USER_AGENT, timeout=10)
+                # ≥1s between calls process-wide (the limiter is thread-safe);
+                # Nominatim's usage policy is per client, not per thread.
+                rate_geocode = RateLimiter(
+                    g.geocode, min_delay_seconds=1, max_retries=2, error_wait_seconds=2
+                )
+                _geocoder = (g, rate_geocode)
+    return _geocoder
 
-    g = Nominatim(user_agent=NOMINATIM_USER_AGENT, timeout=10)
-    # ≥1s delay per thread; Nominatim is strict. Keep workers low.
-    rate_geocode = RateLimiter(
-        g.geocode, min_delay_seconds=1, max_retries=2, error_wait_seconds=2
-    )
-    return g, rate_geocode
 
+def _utcnow() -> datetime:
+    """Current UTC time as a naive datetime, matching the ISO strings already stored."""
+
+    return datetime.now(timezone.utc).replace(tzinfo=None)
 
-def geocode_via_nominatim(name: str, rate_geocode) -> Optional[Tuple[float, float]]:
-    """Attempt to geocode using Nominatim, returning coordinates if within Scotland."""
+
+def _geocode_key(q: str, params: Dict[str, Any]) -> str:
+    """Normalise a geocode query (plus any Nominatim filters) into a cache key."""
+
+    key = _WS_RE.sub(" ", q.lower().strip())
+    if params:
+        key += "|" + "&".join(f"{k}={v}" for k, v in sorted(params.items()))
+    return key
+
+
+def cached_geocode(q: str, rate_geocode, **params: Any) -> Optional[Tuple[float, float]]:
+    """Geocode ``q`` via the persistent geocode_cache, calling Nominatim only on a miss.
+
+    ``params`` are extra Nominatim filters (``country_codes``, ``viewbox``...).
+    """
+
+    key = _geocode_key(q, params)
+    conn = _cache_conn()
+    row = conn.execute(
+        "SELECT lat, lon, hit_at FROM geocode_cache WHERE query = ?", (key,)
+    ).fetchone()
+    if row:
+        lat, lon, hit_at = row
+        ttl = GEOCODE_TTL if lat is not None else GEOCODE_MISS_TTL
+        if _utcnow() - datetime.fromisoformat(hit_at) < ttl:
+            return (lat, lon) if lat is not None else None
+
+    # Errors propagate uncached; only a genuine "no result" is stored as a miss.
+    loc = rate_geocode(q, exactly_one=True, **params)
+    coords = (float(loc.latitude), float(loc.longitude)) if loc else None
+    lat, lon = coords or (None, None)
+    with conn:  # the connection is long-lived, so never leave a transaction open
+        conn.execute(
+            "INSERT OR REPLACE INTO geocode_cache (query, lat, lon, hit_at) VALUES (?, ?, ?, ?)",
+            (key, lat, lon, _utcnow().isoformat()),
+        )
+    return coords
+
+
+@dataclass
+class GeocodeResult:
+    """Nominatim outcome: coords inside Scotland, or whether it only found places outside."""
+
+    coords: Optional[Tuple[float, float]] = None
+    was_outside_bbox: bool = False
+
+
+def geocode_via_nominatim(name: str, rate_geocode) -> GeocodeResult:
+    """Attempt to geocode using Nominatim, keeping only coordinates within Scotland."""
 
     clean = sanitize_name(name)
     candidates = [name]
@@ -167,19 +323,21 @@ def geocode_via_nominatim(name: str, rate_geocode) -> Optional[Tuple[float, floa
         )
 
     seen = set()
+    outside = False
     for q in variants:
         if q in seen:
             continue
         seen.add(q)
         try:
-            loc = rate_geocode(q, addressdetails=False, exactly_one=True)
+            coords = cached_geocode(q, rate_geocode, **SCOTLAND_GEOCODE_PARAMS)
         except Exception:
-            loc = None
-        if loc:
-            lat, lon = float(loc.latitude), float(loc.longitude)
+            coords = None
+        if coords:
+            lat, lon = coords
             if _within_bbox(lat, lon, SCOTLAND_BBOX):
-                return lat, lon
-    return None
+                return GeocodeResult(coords=(lat, lon))
+            outside = True
+    return GeocodeResult(was_outside_bbox=outside)
 
 
 def geocode_via_overpass(name: str) -> Optional[Tuple[float, float]]:
@@ -234,40 +392,47 @@ def geocode_via_overpass(name: str) -> Optional[Tuple[float, float]]:
 
 
 def _process_one(
-    i: int, total: int, name: str
+    i: int, total: int, name: str, rate_geocode
 ) -> Optional[Tuple[str, float, float, str]]:
     """Worker: try Nominatim first; on failure, try Overpass; return (name, lat, lon, source)."""
     try:
-        _, rate_geocode = _nominatim_geocoder()
-        coords = geocode_via_nominatim(name, rate_geocode)
-        if coords:
-            lat, lon = coords
-            with _print_lock:
-                print(
-                    f"[{i}/{total}] ✅ {name} -> ({lat:.5f}, {lon:.5f}) via Nominatim",
-                    flush=True,
-                )
+        result = geocode_via_nominatim(name, rate_geocode)
+        if result.coords:
+            lat, lon = result.coords
+            _log_q.put(f"[{i}/{total}] ✅ {name} -> ({lat:.5f}, {lon:.5f}) via Nominatim\n")
             return (name, lat, lon, "nominatim")
+        if result.was_outside_bbox:
+            # The name resolves, just not in Scotland; Overpass (up to 25 s) won't help.
+            _log_q.put(f"[{i}/{total}] ⚠️  {name} only found outside Scotland\n")
+            return None
 
         coords = geocode_via_overpass(name)
         if coords:
             lat, lon = coords
-            with _print_lock:
-                print(
-                    f"[{i}/{total}] ✅ {name} -> ({lat:.5f}, {lon:.5f}) via Overpass",
-                    flush=True,
-                )
+            _log_q.put(f"[{i}/{total}] ✅ {name} -> ({lat:.5f}, {lon:.5f}) via Overpass\n")
             return (name, lat, lon, "overpass")
 
-        with _print_lock:
-            print(f"[{i}/{total}] ⚠️  Could not geocode {name}", flush=True)
+        _log_q.put(f"[{i}/{total}] ⚠️  Could not geocode {name}\n")
         return None
     except Exception as e:
-        with _print_lock:
-            print(f"[{i}/{total}] ❌ {name} failed with error: {e}", flush=True)
+        _log_q.put(f"[{i}/{total}] ❌ {name} failed with error: {e}\n")
         return None
 
 
+def _drain_log(batch: List[str], force: bool = False) -> None:
+    """Move queued progress lines into ``batch``; write it once it is big enough."""
+
+    while True:
+        try:
+            batch.append(_log_q.get_nowait())
+        except Empty:
+            break
+    if batch and (force or len(batch) >= _LOG_BATCH):
+        sys.stdout.write("".join(batch))
+        sys.stdout.flush()
+        batch.clear()
+
+
 def build_or_update_coords(
     source: str = "auto", limit: Optional[int] = None
 ) -> pd.DataFrame:
@@ -282,22 +447,29 @@ def build_or_update_coords(
     conn = _ensure_conn()
     _ensure_schema(conn)
 
-    existing = pd.read_sql_query("SELECT name FROM munro_coords", conn)["name"].tolist()
+    import pandas as pd
+
+    existing = {r[0] for r in conn.execute("SELECT name FROM munro_coords")}
     missing = [n for n in names if n not in existing]
 
     if missing:
         total = len(missing)
-        with _print_lock:
-            print(
-                f"[⋯] Geocoding {total} missing Munros (workers={MAX_WORKERS}) ...",
-                flush=True,
-            )
+        print(
+            f"[⋯] Geocoding {total} missing Munros (workers={MAX_WORKERS}) ...",
+            flush=True,
+        )
 
+        # Shared client and limiter: the 1 req/s budget is global and the HTTP
+        # session stays warm, while Overpass fallbacks still overlap.
+        _, rate_geocode = _nominatim_geocoder()
+        # One timestamp for the whole build; rows are written in a single batch anyway.
+        updated_at = _utcnow().isoformat()
         rows = []
+        log_batch: List[str] = []
         completed, ok = 0, 0
         with ThreadPoolExecutor(max_workers=max(1, MAX_WORKERS)) as ex:
             futures = {
-                ex.submit(_process_one, idx, total, n): n
+                ex.submit(_process_one, idx, total, n, rate_geocode): n
                 for idx, n in enumerate(missing, start=1)
             }
             for fut in as_completed(futures):
@@ -305,22 +477,34 @@ def build_or_update_coords(
                 res = fut.result()
                 if res:
                     name, lat, lon, src = res
-                    rows.append((name, lat, lon, src, datetime.utcnow().isoformat()))
+                    rows.append((name, lat, lon, src, updated_at))
                     ok += 1
+                _drain_log(log_batch)
+        _drain_log(log_batch, force=True)
 
         if rows:
-            conn.executemany(
-                "INSERT OR REPLACE INTO munro_coords (name, lat, lon, source, updated_at) VALUES (?, ?, ?, ?, ?)",
-                rows,
-            )
-            conn.commit()
+            # One write transaction, taken up front so concurrent readers can't make
+            # the batch fail half-way with SQLITE_BUSY; `with` commits or rolls back.
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                # Upsert in place (no delete + reinsert), so rowids stay stable.
+                conn.executemany(
+                    """
+                    INSERT INTO munro_coords (name, lat, lon, source, updated_at)
+                    VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT(name) DO UPDATE SET
+                        lat = excluded.lat,
+                        lon = excluded.lon,
+                        source = excluded.source,
+                        updated_at = excluded.updated_at
+                    """,
+                    rows,
+                )
+                _sync_rtree(conn)
 
-        with _print_lock:
-            print(f"[✓] Done: {ok}/{total} resolved; {total - ok} failed.", flush=True)
+        print(f"[✓] Done: {ok}/{total} resolved; {total - ok} failed.", flush=True)
 
-    df = pd.read_sql_query("SELECT name, lat, lon FROM munro_coords", conn)
-    conn.close()
-    return df
+    return pd.read_sql_query("SELECT name, lat, lon FROM munro_coords", conn)
 
 
 # ------------------------- Distance queries -------------------------
@@ -329,45 +513,109 @@ def build_or_update_coords(
 def _haversine_np(lat1, lon1, lat2, lon2):
     """Vectorised haversine distance in kilometres between coordinate arrays."""
 
+    import numpy as np
+
     R = 6371.0088
-    lat1 = np.radians(lat1)
-    lon1 = np.radians(lon1)
-    lat2 = np.radians(lat2)
-    lon2 = np.radians(lon2)
-    dlat = lat2 - lat1
-    dlon = lon2 - lon1
-    a = np.sin(dlat / 2.0) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2.0) ** 2
+    phi2 = np.radians(lat2)
+    if np.isscalar(lat1) and np.isscalar(lon1):
+        # One query point (the common case): its trig stays in Python floats so
+        # only the N-element columns allocate arrays.
+        phi1 = math.radians(lat1)
+        cos_phi1 = math.cos(phi1)
+        dlon = np.radians(lon2) - math.radians(lon1)
+    else:
+        phi1 = np.radians(lat1)
+        cos_phi1 = np.cos(phi1)
+        dlon = np.radians(lon2) - np.radians(lon1)
+    dlat = phi2 - phi1
+    a = np.sin(dlat * 0.5) ** 2 + cos_phi1 * np.cos(phi2) * np.sin(dlon * 0.5) ** 2
     return 2 * R * np.arcsin(np.sqrt(a))
 
 
+def _bbox_around(
+    lat: float, lon: float, radius_km: float
+) -> Optional[Tuple[float, float, float, float]]:
+    """Lat/lon box holding every point within ``radius_km``, or ``None`` if unbounded."""
+
+    ang = radius_km / EARTH_RADIUS_KM
+    cos_lat = math.cos(math.radians(lat))
+    # Distance to the meridian at Δlon is asin(sin Δlon · cos lat), hence this bound.
+    s = math.sin(ang) / cos_lat if cos_lat > 0 else 2.0
+    if ang >= math.pi / 2 or s >= 1.0:
+        return None
+    dlat = math.degrees(ang)
+    dlon = math.degrees(math.asin(s))
+    return lat - dlat, lat + dlat, lon - dlon, lon + dlon
+
+
 def geocode_location(query: str) -> Tuple[float, float]:
     """Geocode an arbitrary location and return latitude/longitude."""
 
     _, rate_geocode = _nominatim_geocoder()
-    loc = rate_geocode(query, exactly_one=True)
-    if not loc:
+    coords = cached_geocode(query, rate_geocode)
+    if not coords:
         raise ValueError(f"Could not geocode location: {query}")
-    return float(loc.latitude), float(loc.longitude)
+    return coords
 
 
-def nearest_munros_to_point(lat: float, lon: float, k: int = 20) -> pd.DataFrame:
-    """Return the ``k`` nearest Munros for a given latitude/longitude."""
+def nearest_munros_to_point(
+    lat: float, lon: float, k: int = 20
+) -> List[Dict[str, Any]]:
+    """Return the ``k`` nearest Munros (name, lat, lon, distance_km), nearest first."""
 
+    import numpy as np
+
+    lat, lon = float(lat), float(lon)
+    # Read-only: the R-Tree is built at app boot (db.ensure_schema) or by
+    # build_or_update_coords, never on the request path.
     conn = _ensure_conn()
-    df = pd.read_sql_query("SELECT name, lat, lon FROM munro_coords", conn)
-    conn.close()
-    if df.empty:
-        raise RuntimeError("munro_coords is empty. Run build_or_update_coords() first.")
-    distances = _haversine_np(lat, lon, df["lat"].to_numpy(), df["lon"].to_numpy())
-    out = df.copy()
-    out["distance_km"] = distances
-    out.sort_values("distance_km", inplace=True)
-    return out.head(k).reset_index(drop=True)
+    has_tree = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE name = 'munro_rtree'"
+    ).fetchone()
+    # Prefilter with the R-Tree, widening until the k-th hit lies inside the search
+    # radius (so nothing outside the box can beat it); unbounded means a full scan.
+    radius = NEAREST_RADIUS_KM
+    while True:
+        box = _bbox_around(lat, lon, radius) if has_tree else None
+        if box is None:
+            rows = conn.execute("SELECT name, lat, lon FROM munro_coords").fetchall()
+            if not rows:
+                raise RuntimeError(
+                    "munro_coords is empty. Run build_or_update_coords() first."
+                )
+        else:
+            rows = conn.execute(_NEAREST_BOX_SQL, box).fetchall()
+        # Raw rows straight into arrays; float32 is ample for km distances across Scotland.
+        n = len(rows)
+        lats = np.fromiter((r[1] for r in rows), dtype=np.float32, count=n)
+        lons = np.fromiter((r[2] for r in rows), dtype=np.float32, count=n)
+        distances = _haversine_np(lat, lon, lats, lons)
+        if 0 < k < n:
+            # O(n) selection of the k smallest, then sort just those.
+            top = np.argpartition(distances, k - 1)[:k]
+            order = top[np.argsort(distances[top], kind="stable")]
+        else:
+            order = np.argsort(distances, kind="stable")[:k]
+        if box is None or (
+            len(order) == k and (k == 0 or distances[order[-1]] <= radius)
+        ):
+            break
+        radius *= 4
+
+    return [
+        {
+            "name": rows[i][0],
+            "lat": rows[i][1],
+            "lon": rows[i][2],
+            "distance_km": float(distances[i]),
+        }
+        for i in order
+    ]
 
 
 def nearest_munros_from_user_location(
     user_location_str: str, k: int = 20
-) -> pd.DataFrame:
+) -> List[Dict[str, Any]]:
     """Convenience wrapper that geocodes a user query then runs nearest search."""
 
     ulat, ulon = geocode_location(user_location_str)
@@ -379,6 +627,8 @@ def nearest_munros_from_user_location(
 if __name__ == "__main__":
     import argparse
 
+    import pandas as pd
+
     parser = argparse.ArgumentParser(
         description="Build Munro coordinate DB & query nearest."
     )
@@ -397,7 +647,8 @@ if __name__ == "__main__":
     if args.nearest:
         if not os.path.exists(DB_PATH):
             raise SystemExit("No db.sqlite found. Run with --build first.")
-        df = nearest_munros_from_user_location(args.nearest, k=args.k)
+        # pandas only for the CLI's table/CSV output.
+        df = pd.DataFrame(nearest_munros_from_user_location(args.nearest, k=args.k))
         print(df.to_string(index=False))
         if args.csv:
             df.to_csv(args.csv, index=False)
@@ -1,15 +1,17 @@
 from flask import Flask
-from .health import bp as health_bp
-from .munros import bp as munros_bp
-from .tags import bp as tags_bp
-from .search import bp as search_bp
-from .chat import bp as chat_bp
-from db import init_app as init_db
 
 
 def register_blueprints(app: Flask):
     """Attach all HTTP blueprints and shared extensions to the Flask app."""
 
+    # Imported here so importing `routes` doesn't pull in the chat/search/geo stack.
+    from db import init_app as init_db
+    from .health import bp as health_bp
+    from .munros import bp as munros_bp
+    from .tags import bp as tags_bp
+    from .search import bp as search_bp
+    from .chat import bp as chat_bp
+
     # Ensure the database teardown handler is registered before the first request.
     init_db(app)
 
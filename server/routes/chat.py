@@ -1,20 +1,94 @@
 import re
-import json
-from flask import Blueprint, request, jsonify, current_app
-from extensions.llm import get_llm
+from concurrent.futures import ThreadPoolExecutor
+from flask import Blueprint, request, jsonify, current_app, stream_with_context
+from db import catalog_version
+from extensions.llm import get_llm, get_json_llm, get_llm_batcher
+from services.llm_cache import cached_invoke, cached_stream, llm_cache
+from services.chat_cache import INTENT_SCHEMA_VERSION, cache_key, get_cached, store
+from services.geo_service import LOCATION_MISS, resolve_location
 from services.search_service import (
     search_core,
     search_by_location_core,
-    compact_dataset_slice,
-    format_compact_lines,
+    dataset_summary as cached_dataset_summary,
+    find_munro_by_name,
+    format_context,
     pick_route_names_llm,
     names_to_ids,
+    tags_for_ids,
 )
 from utils.query import normalize_grade_max
 from utils.filters import parse_numeric_filters  # NEW
+from utils.llm_json import parse_json_object
 
 bp = Blueprint("chat", __name__)
 
+# Streamed replies: {"route": ...} picks, {"delta": ...} text, then {"done": true, ...reply}.
+_NDJSON = "application/x-ndjson"
+
+# Candidate fields the client's search inspector renders.
+_RESULT_FIELDS = ("id", "name", "tags", "summary")
+
+# Runs the network-bound intent call while the request thread does local work.
+_LLM_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="chat-llm")
+# Geocoding is rate-limited upstream; its own small pool keeps it off the LLM workers.
+_GEO_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix="chat-geo")
+
+# Tag vocabulary offered in the intent prompt; anything else the LLM returns is dropped.
+_ALLOWED_TAGS = frozenset({
+    "ridge", "scramble", "technical", "steep", "rocky", "boggy", "heather", "scree",
+    "handson", "knifeedge", "airy", "slab", "gully", "easy", "moderate", "hard",
+    "serious", "pathless", "loose_rock", "cornice", "river_crossing", "slippery",
+    "exposure", "bus", "train", "bike", "classic", "views", "waterfalls", "bothy",
+    "scrambling", "camping", "multiday", "popular", "quiet", "family",
+})
+
+# Static prompt text lives in the system message, ahead of the per-request user message,
+# so the provider's automatic prefix caching can reuse it across calls.
+_INTENT_SYSTEM = """You are an intent parser for a Munro route assistant.
+Extract structured filters for Munro search.
+
+Extract:
+- compact FTS 'query'
+- 'include_tags' and 'exclude_tags'
+- 'location' (single string or null)
+- numeric filters if present:
+  - distance_min_km, distance_max_km (route length)
+  - time_min_h, time_max_h (estimated time)
+
+Examples:
+- "at least 15km" -> distance_min_km = 15
+- "under 6 hours" -> time_max_h = 6
+- "between 10 and 15km" -> distance_min_km = 10, distance_max_km = 15
+
+Allowed tags:
+['ridge','scramble','technical','steep','rocky','boggy','heather','scree','handson','knifeedge','airy','slab','gully',
+ 'easy','moderate','hard','serious','pathless','loose_rock','cornice','river_crossing','slippery','exposure',
+ 'bus','train','bike','classic','views','waterfalls','bothy','scrambling','camping','multiday','popular','quiet','family']
+
+Rules:
+- Include only tags clearly implied. Be conservative.
+- 'river_crossing' only if explicit wade/ford, not if a bridge/stepping stones exist.
+- Return STRICT JSON keys: query, include_tags, exclude_tags, bog_max, grade_max, location,
+  distance_min_km, distance_max_km, time_min_h, time_max_h.
+"""
+
+_ANSWER_SYSTEM = """You are a helpful Munro route assistant. Answer based only on the provided context.
+
+Write a concise helpful answer:
+- If exact matches were provided, start with 1–2 routes that best fit, then alternatives.
+- If no exact matches were provided (dataset view), pick 3–6 routes that best fit and justify briefly.
+- Explain why they fit (use tags like 'scramble','airy','bus','train','camping','multiday', etc.).
+- Keep it under ~180 words and avoid generic filler.
+"""
+
+# Streaming variant: picks come first as JSONL so the UI can show them before the prose.
+_ROUTE_SENTINEL = "---"
+_ANSWER_STREAM_SYSTEM = _ANSWER_SYSTEM + f"""
+Before the answer, list the routes you recommend as JSON lines, one object per line:
+{{"name": "<route name exactly as in the context>", "why": "<one short reason>"}}
+Then output a line containing only {_ROUTE_SENTINEL} and then the answer text.
+"""
+
 # Heuristic location extractor with guard against "at least", numbers, units, etc.
 _FILTER_STOP = r"(?:at\s+least|at\s+most|more\s+than|less\s+than|over|under|between|within|with|for|of|\d+|km|mi|miles|kilomet)"
 
@@ -30,20 +104,132 @@ _LOCATION_PATTERNS = [
     + r"|\s*$|[.,;:!?])",
     r"\bfrom\s+([A-Za-z][A-Za-z\s'\-]+?)(?=\s+" + _FILTER_STOP + r"|\s*$|[.,;:!?])",
 ]
+# Compiled once, tried in priority order (earlier patterns win, not earlier text).
+_LOCATION_RES = [re.compile(p, re.IGNORECASE) for p in _LOCATION_PATTERNS]
+# All patterns as one alternation: a single scan rejects the common no-location message.
+_LOCATION_ANY = re.compile("|".join(f"(?:{p})" for p in _LOCATION_PATTERNS), re.IGNORECASE)
+_TRAIL_PUNCT = re.compile(r"[.,;:!?]+$")
 
 
 def extract_location_heuristic(text: str) -> str:
     """Fallback regex extractor for locations when the LLM misses them."""
 
     s = (text or "").strip()
-    for pat in _LOCATION_PATTERNS:
-        m = re.search(pat, s, flags=re.IGNORECASE)
+    if not _LOCATION_ANY.search(s):
+        return ""
+    for rx in _LOCATION_RES:
+        m = rx.search(s)
         if m:
             loc = m.group(1).strip()
-            return re.sub(r"[.,;:!?]+$", "", loc).strip()
+            return _TRAIL_PUNCT.sub("", loc).strip()
     return ""
 
 
+# Tag keywords (optionally plural) and the filler words a message may contain
+# besides them for the keyword parser to claim it; anything else goes to the LLM.
+_TAG_WORDS = re.compile(
+    r"\b(" + "|".join(sorted(_ALLOWED_TAGS, key=len, reverse=True)) + r")s?\b"
+)
+_WORDS = re.compile(r"[a-z0-9']+")
+_FILLER_WORDS = frozenset({
+    "a", "an", "the", "i", "i'm", "im", "me", "my", "we", "us", "our", "want", "would",
+    "like", "looking", "look", "for", "show", "find", "suggest", "recommend", "give",
+    "some", "any", "good", "nice", "great", "route", "routes", "walk", "walks", "hike",
+    "hikes", "hiking", "munro", "munros", "hill", "hills", "mountain", "mountains",
+    "day", "with", "and", "near", "nearby", "around", "in", "at", "close", "to", "from",
+    "by", "on", "please", "something", "what", "which", "are", "is", "there", "can",
+    "you", "options", "ideas",
+})
+
+
+def _empty_intent(**fields):
+    """Intent dict with every key the retrieval step reads, overridden by ``fields``."""
+
+    intent = {
+        "query": "",
+        "include_tags": [],
+        "exclude_tags": [],
+        "bog_max": None,
+        "grade_max": None,
+        "location": None,
+        "distance_min_km": None,
+        "distance_max_km": None,
+        "time_min_h": None,
+        "time_max_h": None,
+    }
+    intent.update(fields)
+    return intent
+
+
+# Lead-in / trailing words around a bare Munro name ("show me Ben Nevis", "Ben Nevis routes?").
+_NAME_LEAD = re.compile(
+    r"^(?:(?:please|can\s+you|could\s+you)\s+)?"
+    r"(?:show\s+me|tell\s+me\s+about|what\s+about|info(?:rmation)?\s+(?:on|about)"
+    r"|details\s+(?:of|for|on)|routes?\s+(?:on|up|for)|climbing|climb|walking\s+up)?"
+    r"\s*(?:the\s+)?(?:routes?\s+(?:on|up|for)\s+)?",
+    re.IGNORECASE,
+)
+_NAME_TAIL = re.compile(r"\s*(?:routes?|walks?|hikes?)?(?:\s+please)?[\s.?!]*$", re.IGNORECASE)
+
+
+def name_phrase(text: str) -> str:
+    """Strip request phrasing around what may be a bare Munro name."""
+
+    return _NAME_TAIL.sub("", _NAME_LEAD.sub("", (text or "").strip(), count=1)).strip()
+
+
+def keyword_intent(text: str, location: str):
+    """Build the intent locally when tag keywords and a place explain the whole message.
+
+    Returns ``None`` (use the LLM) if any word is left over, e.g. numbers,
+    negations or comparisons that need real parsing.
+    """
+
+    lowered = (text or "").lower()
+    tags = list(dict.fromkeys(m.group(1) for m in _TAG_WORDS.finditer(lowered)))
+    if not tags and not location:
+        return None
+    place_words = set(_WORDS.findall(location.lower()))
+    if place_words & _FILLER_WORDS:
+        return None  # the regex probably swallowed trailing words ("Fort William please")
+    for w in _WORDS.findall(_TAG_WORDS.sub(" ", lowered)):
+        if w not in _FILLER_WORDS and w not in place_words:
+            return None
+    # Tags go into the ranked FTS query rather than as AND-ed hard filters; the
+    # location path only uses include_tags as a soft boost, so it keeps them.
+    return _empty_intent(
+        query=" ".join(tags),
+        include_tags=tags if location else [],
+        location=location or None,
+    )
+
+
+# Negation cues; a tag after one (in the same clause) is an exclusion, not a request.
+_NEGATION = re.compile(r"\b(?:without|no|not|avoid(?:ing)?|except|excluding|don'?t)\b")
+_CLAUSE_BREAK = re.compile(r"[.,;:!?]|\bbut\b")
+
+
+def semantic_facets(text: str, location: str, numeric) -> tuple:
+    """Request facets a semantic cache hit must match exactly, whatever the wording.
+
+    Place, included and excluded tag words, and the numeric distance/time bounds;
+    two messages differing in any of these never share a cached reply.
+    """
+
+    lowered = (text or "").lower()
+    include, exclude = set(), set()
+    for m in _TAG_WORDS.finditer(lowered):
+        breaks = [b.end() for b in _CLAUSE_BREAK.finditer(lowered, 0, m.start())]
+        clause = lowered[breaks[-1] if breaks else 0:m.start()]
+        (exclude if _NEGATION.search(clause) else include).add(m.group(1))
+    return (
+        " ".join(location.split()).casefold(),
+        tuple(sorted(include)),
+        tuple(sorted(exclude)),
+        tuple(sorted(numeric.items())),
+    )
+
+
 def _coerce_float(x):
     """Safely cast arbitrary payload values to floats or return ``None``."""
 
@@ -55,6 +241,97 @@ def _coerce_float(x):
         return None
 
 
+def _templated_answer(candidates, route_links, limit: int) -> str:
+    """Plain-text reply used when answer synthesis is unavailable."""
+
+    if candidates:
+        bullet_lines = []
+        for r in candidates[:limit]:
+            base = r.get("name", "Unknown route")
+            tag_str = ", ".join(r.get("tags", []))
+            if tag_str:
+                base += f" ({tag_str})"
+            distance = r.get("route_distance") or r.get("distance_km")
+            if isinstance(distance, (int, float)):
+                base += f", ~{float(distance):.1f} km"
+            time_val = r.get("route_time")
+            if isinstance(time_val, (int, float)):
+                base += f", ~{float(time_val):.1f} h"
+            summary = (r.get("summary") or r.get("snippet") or "").strip()
+            if summary:
+                base += f" – {summary[:140]}"
+            bullet_lines.append(f"• {base}")
+        return "Here are some routes that match your filters:\n" + "\n".join(bullet_lines)
+    if route_links:
+        names = ", ".join(r.get("name", "Unknown route") for r in route_links)
+        return (
+            "I couldn't summarise the details just now, but these routes look relevant: "
+            + names
+        )
+    return (
+        "I couldn't reach the assistant to compose a reply, but I didn't find any "
+        "matching routes either. Please try adjusting your request."
+    )
+
+
+def _ndjson(obj) -> str:
+    """Encode one NDJSON line with the app's JSON provider."""
+
+    return current_app.json.dumps(obj) + "\n"
+
+
+def _stream_events(tokens, route_links):
+    """Split streamed synthesis tokens into route picks (leading JSONL) and text deltas.
+
+    Picks are matched to ``route_links`` by name; unknown names are dropped. If the
+    model skips the JSONL block, everything is passed through as text.
+    """
+
+    by_name = {r["name"].lower(): r for r in route_links}
+    in_routes = True
+    buf = ""
+    for tok in tokens:
+        if not in_routes:
+            yield {"delta": tok}
+            continue
+        buf += tok
+        while in_routes:
+            head = buf.lstrip()
+            if head and head[0] not in "{-":
+                in_routes = False  # no JSONL block; stream prose from the first token
+                break
+            if "\n" not in buf:
+                break  # a pick or sentinel line still arriving
+            line, rest = buf.split("\n", 1)
+            line = line.strip()
+            if line == _ROUTE_SENTINEL:
+                in_routes, buf = False, rest
+            elif not line:
+                buf = rest
+            elif line.startswith("{"):
+                buf = rest
+                pick = parse_json_object(line) or {}
+                link = by_name.get(str(pick.get("name", "")).strip().lower())
+                if link is not None:
+                    yield {"route": {**link, "why": pick.get("why") or ""}}
+            else:
+                in_routes = False  # no JSONL block; this line is already prose
+        if not in_routes and buf:
+            yield {"delta": buf}
+            buf = ""
+    if buf.strip() and buf.strip() != _ROUTE_SENTINEL:
+        yield {"delta": buf}
+
+
+def _reply_response(reply, stream: bool):
+    """Serve a finished reply as JSON, or as a one-delta NDJSON stream if requested."""
+
+    if not stream:
+        return jsonify(reply)
+    body = _ndjson({"delta": reply.get("answer") or ""}) + _ndjson({"done": True, **reply})
+    return current_app.response_class(body, mimetype=_NDJSON)
+
+
 @bp.post("/chat")
 def chat():
     """Conversational endpoint backed by shared search logic and an LLM."""
@@ -63,82 +340,114 @@ def chat():
     if not use_llm:
         return jsonify({"error": "LLM not configured"}), 500
 
-    data = request.get_json(force=True) or {}
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"error": "expected a JSON object body"}), 400
     user_msg = (data.get("message") or "").strip()
     limit = int(data.get("limit") or 8)
     debug = bool(data.get("debug") or False)
+    stream = bool(data.get("stream") or False)
+
+    # Identical requests (SPA reloads, retries) replay the stored reply without the LLM.
+    model = current_app.config.get("MUNRO_CHAT_MODEL")
+    # The catalog version retires stored replies once the database is reseeded.
+    version = catalog_version()
+    reply_key = cache_key(
+        "chat",
+        model,
+        INTENT_SCHEMA_VERSION,
+        version,
+        limit,
+        debug,
+        user_msg,
+    )
+    cached_reply = get_cached(reply_key)
+    if cached_reply is not None:
+        return _reply_response(cached_reply, stream)
 
-    # 1) Parse intent (now includes location + numeric filters)
-    intent_prompt = f"""
-You are an intent parser for a Munro route assistant.
-
-Extract:
-- compact FTS 'query'
-- 'include_tags' and 'exclude_tags'
-- 'location' (single string or null)
-- numeric filters if present:
-  - distance_min_km, distance_max_km (route length)
-  - time_min_h, time_max_h (estimated time)
-
-Examples:
-- "at least 15km" -> distance_min_km = 15
-- "under 6 hours" -> time_max_h = 6
-- "between 10 and 15km" -> distance_min_km = 10, distance_max_km = 15
-
-Allowed tags:
-['ridge','scramble','technical','steep','rocky','boggy','heather','scree','handson','knifeedge','airy','slab','gully',
- 'easy','moderate','hard','serious','pathless','loose_rock','cornice','river_crossing','slippery','exposure',
- 'bus','train','bike','classic','views','waterfalls','bothy','scrambling','camping','multiday','popular','quiet','family']
+    # Optional paraphrase cache: "close to X" can reuse the reply for "near X".
+    # Similar wording is not enough: place, tags (and their negation) and numeric
+    # bounds must match exactly, so "near Fort William" never reuses "near Aviemore".
+    loc_heur = extract_location_heuristic(user_msg)
+    num_fallback = parse_numeric_filters(user_msg)
+    semantic = current_app.extensions.get("semantic_cache")
+    semantic_scope = (
+        model,
+        INTENT_SCHEMA_VERSION,
+        version,
+        limit,
+        debug,
+        semantic_facets(user_msg, loc_heur, num_fallback),
+    )
+    msg_vec = None
+    if semantic is not None and user_msg:
+        try:
+            msg_vec = semantic.embed(user_msg)
+        except Exception:
+            current_app.logger.warning("[chat] embedding failed; skipping semantic cache", exc_info=True)
+        if msg_vec is not None:
+            similar_reply = semantic.lookup(msg_vec, semantic_scope)
+            if similar_reply is not None:
+                return _reply_response(similar_reply, stream)
+    # Replies built on a failed LLM call are served but never stored.
+    cacheable = True
 
-Rules:
-- Include only tags clearly implied. Be conservative.
-- 'river_crossing' only if explicit wade/ford, not if a bridge/stepping stones exist.
-- Return STRICT JSON keys: query, include_tags, exclude_tags, bog_max, grade_max, location,
-  distance_min_km, distance_max_km, time_min_h, time_max_h.
+    # 1) Parse intent (now includes location + numeric filters)
+    # Plain "<tags> near <place>" messages are parsed locally, skipping the LLM call.
+    intent = keyword_intent(user_msg, loc_heur)
+    direct = None
+    if intent is None and not loc_heur:
+        # A message naming exactly one Munro needs no intent parsing at all.
+        direct = find_munro_by_name(name_phrase(user_msg))
+        if direct is not None:
+            intent = _empty_intent(query=direct["results"][0]["name"])
+    intent_future = None
+    if intent is None:
+        intent_messages = [
+            {"role": "system", "content": _INTENT_SYSTEM},
+            {"role": "user", "content": f"User message: {user_msg}"},
+        ]
+        batcher = get_llm_batcher()
+        if batcher is not None:
+            intent_future = batcher.submit(intent_messages)
+        else:
+            intent_future = _LLM_POOL.submit(
+                cached_invoke, get_json_llm(), intent_messages, model, "json"
+            )
 
-User message: {user_msg}
-"""
-    try:
-        intent_raw = llm.invoke(
-            [
-                {
-                    "role": "system",
-                    "content": "Extract structured filters for Munro search.",
-                },
-                {"role": "user", "content": intent_prompt},
-            ]
-        ).content.strip()
-    except Exception:
-        current_app.logger.exception("[chat] intent parsing failed; using fallback filters")
-        intent_raw = ""
+    # Geocode the heuristic place now, overlapping the LLM round trip; the location
+    # search reuses the coordinates.
+    geo_future = _GEO_POOL.submit(resolve_location, loc_heur) if loc_heur else None
 
-    try:
-        intent = json.loads(intent_raw)
-    except Exception:
-        intent = {
-            "query": user_msg,
-            "include_tags": [],
-            "exclude_tags": [],
-            "bog_max": None,
-            "grade_max": None,
-            "location": None,
-            "distance_min_km": None,
-            "distance_max_km": None,
-            "time_min_h": None,
-            "time_max_h": None,
-        }
+    if intent_future is not None:
+        try:
+            intent_raw = intent_future.result()
+        except Exception:
+            current_app.logger.exception("[chat] intent parsing failed; using fallback filters")
+            intent_raw = ""
+            cacheable = False
+        # JSON mode should always yield an object; anything unparseable -> defaults.
+        intent = parse_json_object(intent_raw)
+    if intent is None:
+        intent = _empty_intent(query=user_msg)
 
     # Ensure keys exist
     for k in ("distance_min_km", "distance_max_km", "time_min_h", "time_max_h"):
         intent[k] = intent.get(k, None)
 
+    # Keep only known tags (normalised) so stray LLM spellings never reach SQL.
+    for k in ("include_tags", "exclude_tags"):
+        tags = intent.get(k)
+        if not isinstance(tags, list):
+            tags = []
+        normalised = (t.strip().lower() for t in tags if isinstance(t, str))
+        intent[k] = [t for t in normalised if t in _ALLOWED_TAGS]
+
     # Heuristic fallbacks if the LLM missed key pieces of information.
-    loc_heur = extract_location_heuristic(user_msg)
     if not (intent.get("location") or "").strip() and loc_heur:
         intent["location"] = loc_heur
 
     # Regex fallback for numeric filters
-    num_fallback = parse_numeric_filters(user_msg)
     for k, v in num_fallback.items():
         if intent.get(k) is None:
             intent[k] = v
@@ -153,11 +462,23 @@ User message: {user_msg}
     # 2) Retrieval via shared search logic
     location = (intent.get("location") or "").strip()
 
-    if location:
+    if direct is not None:
+        search_resp = direct
+        candidates = search_resp["results"]
+        current_app.logger.info(f"[chat][name-mode] -> {candidates[0]['name']}")
+    elif location:
+        resolved = None
+        if geo_future is not None and location == loc_heur:
+            try:
+                # A clean miss is final; only an unexpected error is worth a retry below.
+                resolved = geo_future.result() or LOCATION_MISS
+            except Exception:
+                pass  # the search below geocodes again and reports the failure
         # Location-first path: distance-ranked, tags as soft boost
         try:
             search_resp = search_by_location_core(
                 location=location,
+                resolved=resolved,
                 include_tags=intent.get("include_tags") or [],
                 limit=limit,
                 distance_min_km=intent.get("distance_min_km"),
@@ -225,29 +546,17 @@ User message: {user_msg}
     broad_used = False
     dataset_summary = ""
     if not candidates:
-        data_slice = compact_dataset_slice(limit_items=250)
-        dataset_summary = format_compact_lines(data_slice, cap=120)
+        dataset_summary = cached_dataset_summary(limit_items=250, cap=120)
         broad_used = True
         picked_names = pick_route_names_llm(dataset_summary, user_msg)
+        if picked_names is None:
+            cacheable = False  # the pick call failed; don't store an empty answer
+            picked_names = []
         mapped = names_to_ids(picked_names)
         if mapped:
-            from db import get_db
-
-            with get_db() as conn:
-                ids = [m["id"] for m in mapped]
-                tag_rows = conn.execute(
-                    f"SELECT munro_id, tag FROM munro_tags WHERE munro_id IN ({','.join('?' for _ in ids)})",
-                    ids,
-                ).fetchall()
-            tmap = {}
-            for tr in tag_rows:
-                tmap.setdefault(tr["munro_id"], []).append(tr["tag"])
+            tmap = tags_for_ids([m["id"] for m in mapped])
             route_links = [
-                {
-                    "id": m["id"],
-                    "name": m["name"],
-                    "tags": sorted(tmap.get(m["id"], [])),
-                }
+                {"id": m["id"], "name": m["name"], "tags": tmap[m["id"]]}
                 for m in mapped
             ]
 
@@ -257,20 +566,10 @@ User message: {user_msg}
     )
 
     if candidates:
-        ctx_chunks = []
-        for r in candidates[:limit]:
-            tag_str = ", ".join(r.get("tags", []))
-            if is_location_mode:
-                dist = r.get("distance_km")
-                dist_txt = (
-                    f" (~{dist:.1f} km)" if isinstance(dist, (int, float)) else ""
-                )
-                ctx_chunks.append(
-                    f"- {r['name']}{dist_txt}: {tag_str}\n  {r['snippet']}"
-                )
-            else:
-                ctx_chunks.append(f"- {r['name']}: {tag_str}\n  {r['snippet']}")
-        context = "\n".join(ctx_chunks)
+        # The search services prebuild (and cache) the context with their results.
+        context = search_resp.get("context") or format_context(
+            candidates[:limit], with_distance=is_location_mode
+        )
     else:
         context = f"""No exact matches from search. Consider these dataset items:
 
@@ -279,69 +578,20 @@ User message: {user_msg}
 
     # 5) Synthesis
     location_hint = (
-        "Prioritise proximity and mention approximate distances. "
+        "Prioritise proximity and mention approximate distances.\n"
         if is_location_mode
         else ""
     )
-    answer_prompt = f"""
-You are a helpful Munro route assistant.
-User asked: "{user_msg}"
-
-Context:
-{context}
-
-Write a concise helpful answer:
-- If exact matches were provided, start with 1–2 routes that best fit, then alternatives.
-- If no exact matches were provided (dataset view), pick 3–6 routes that best fit and justify briefly.
-- {location_hint}Explain why they fit (use tags like 'scramble','airy','bus','train','camping','multiday', etc.).
-- Keep it under ~180 words and avoid generic filler.
-"""
-    try:
-        answer = llm.invoke(
-            [
-                {
-                    "role": "system",
-                    "content": "Answer based only on the provided context.",
-                },
-                {"role": "user", "content": answer_prompt},
-            ]
-        ).content.strip()
-    except Exception:
-        current_app.logger.exception("[chat] answer synthesis failed; falling back to templated reply")
-        if candidates:
-            bullet_lines = []
-            for r in candidates[:limit]:
-                base = r.get("name", "Unknown route")
-                tag_str = ", ".join(r.get("tags", []))
-                if tag_str:
-                    base += f" ({tag_str})"
-                distance = r.get("route_distance") or r.get("distance_km")
-                if isinstance(distance, (int, float)):
-                    base += f", ~{float(distance):.1f} km"
-                time_val = r.get("route_time")
-                if isinstance(time_val, (int, float)):
-                    base += f", ~{float(time_val):.1f} h"
-                summary = (r.get("summary") or r.get("snippet") or "").strip()
-                if summary:
-                    base += f" – {summary[:140]}"
-                bullet_lines.append(f"• {base}")
-            answer = (
-                "Here are some routes that match your filters:\n" + "\n".join(bullet_lines)
-            )
-        elif route_links:
-            names = ", ".join(r.get("name", "Unknown route") for r in route_links)
-            answer = (
-                "I couldn't summarise the details just now, but these routes look relevant: "
-                + names
-            )
-        else:
-            answer = (
-                "I couldn't reach the assistant to compose a reply, but I didn't find any "
-                "matching routes either. Please try adjusting your request."
-            )
+    synth_messages = [
+        {"role": "system", "content": _ANSWER_SYSTEM},
+        {
+            "role": "user",
+            "content": f'{location_hint}User asked: "{user_msg}"\n\nContext:\n{context}',
+        },
+    ]
 
-    # Retrieval mode string for debug
-    retrieval_mode = (
+    # Retrieval mode string for debug; the search services report their own when set.
+    retrieval_mode = search_resp.get("retrieval_mode") or (
         "location"
         if is_location_mode
         else ("fts/like/tag" if candidates else "llm_broad")
@@ -369,19 +619,74 @@ Write a concise helpful answer:
             ],
         }
 
-    return jsonify(
-        {
-            "answer": answer,
-            "routes": route_links,  # for Details tab links/buttons
-            "steps": {
-                "intent": intent,
-                "retrieval_mode": retrieval_mode,
-                "sql": search_resp.get("sql"),
-                "params": search_resp.get("params"),
-                "results": candidates,
-                "broad_count": len(route_links) if broad_used else 0,
-                "location": location or None,
-                "debug": debug_block,
-            },
-        }
-    )
+    reply = {
+        "answer": "",
+        "routes": route_links,  # for Details tab links/buttons
+        "steps": {
+            "intent": intent,
+            "retrieval_mode": retrieval_mode,
+            "sql": search_resp.get("sql"),
+            "params": search_resp.get("params"),
+            # Full records (snippets, ranks) only when debugging.
+            "results": (
+                candidates
+                if debug
+                else [{k: r.get(k) for k in _RESULT_FIELDS} for r in candidates]
+            ),
+            "broad_count": len(route_links) if broad_used else 0,
+            "location": location or None,
+            "debug": debug_block,
+        },
+    }
+
+    def remember(finished):
+        """Store a reply built entirely from successful LLM calls."""
+
+        store(reply_key, finished)
+        if msg_vec is not None:
+            semantic.add(msg_vec, semantic_scope, finished)
+
+    if stream:
+
+        def generate():
+            """Yield answer tokens as they arrive, then the full reply."""
+
+            parts = []
+            ok = cacheable
+            stream_messages = [
+                {"role": "system", "content": _ANSWER_STREAM_SYSTEM},
+                synth_messages[1],
+            ]
+            tokens = cached_stream(llm, stream_messages, model)
+            try:
+                for event in _stream_events(tokens, route_links):
+                    if "delta" in event:
+                        parts.append(event["delta"])
+                    yield _ndjson(event)
+            except Exception:
+                current_app.logger.exception("[chat] streamed synthesis failed")
+                ok = False
+                if not parts:
+                    parts.append(_templated_answer(candidates, route_links, limit))
+                    yield _ndjson({"delta": parts[0]})
+            reply["answer"] = "".join(parts).strip()
+            if ok:
+                remember(reply)
+            yield _ndjson({"done": True, **reply})
+
+        return current_app.response_class(
+            stream_with_context(generate()), mimetype=_NDJSON
+        )
+
+    try:
+        reply["answer"] = cached_invoke(llm, synth_messages, model)
+    except Exception:
+        current_app.logger.exception("[chat] answer synthesis failed; falling back to templated reply")
+        cacheable = False
+        reply["answer"] = _templated_answer(candidates, route_links, limit)
+
+    current_app.logger.debug(f"[chat] llm cache {llm_cache.stats()}")
+
+    if cacheable:
+        remember(reply)
+    return jsonify(reply)
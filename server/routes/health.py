@@ -1,10 +1,14 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint, current_app
 
 bp = Blueprint("health", __name__)
 
+# Constant body, serialised once; probes only pay for a bare response object.
+_OK_BODY = b'{"ok":true}'
 
-@bp.get("/health")
+
+@bp.get("/health", strict_slashes=False)
 def health():
     """Health-check endpoint used by hosting providers."""
 
-    return jsonify({"ok": True})
+    # A fresh response each time: after_request hooks (CORS) add headers in place.
+    return current_app.response_class(_OK_BODY, mimetype="application/json")
@@ -1,25 +1,38 @@
-from flask import Blueprint, request, jsonify
-from services.munro_service import list_munros, get_munro as fetch_one
+from flask import Blueprint, current_app, request, jsonify, stream_with_context
+from services.munro_service import iter_munros_json, all_munros_json, get_munro as fetch_one
+from utils.cache import cached_json, catalog_conditional
 
 bp = Blueprint("munros", __name__)
 
 
 @bp.get("/munros")
+@catalog_conditional(max_age=300)
+@cached_json(ttl=300)
 def get_munros():
     """Return a filtered list of Munros based on optional query parameters."""
 
     # Extract primitive filters directly from query parameters.
-    grade = request.args.get("grade", type=int)
-    bog = request.args.get("bog", type=int)
-    search = request.args.get("search", type=str)
-    mid = request.args.get("id", type=int)
+    get = request.args.get
+    grade = get("grade", type=int)
+    bog = get("bog", type=int)
+    search = get("search", type=str)
+    mid = get("id", type=int)
 
-    # Delegate to the service layer so filtering logic is centralised.
-    out = list_munros(grade=grade, bog=bog, search=search, mid=mid)
-    return jsonify(out), 200, {"Content-Type": "application/json; charset=utf-8"}
+    # The unfiltered list is the common case; serve the pre-serialised body.
+    if grade is None and bog is None and not search and mid is None:
+        return current_app.response_class(
+            all_munros_json(), mimetype=current_app.json.mimetype
+        )
+
+    # Delegate to the service layer and stream rows so memory stays flat per request.
+    body = iter_munros_json(grade=grade, bog=bog, search=search, mid=mid)
+    return current_app.response_class(
+        stream_with_context(body), mimetype=current_app.json.mimetype
+    )
 
 
 @bp.get("/munro/<int:mid>")
+@catalog_conditional(max_age=300)
 def get_munro(mid: int):
     """Return a single Munro entry by numeric identifier."""
 
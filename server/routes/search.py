@@ -22,7 +22,9 @@ def search_munros():
     Returns JSON mirroring :func:`search_core` or :func:`search_by_location_core`.
     """
 
-    data = request.get_json(force=True) or {}
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"error": "expected a JSON object body"}), 400
     location = (data.get("location") or "").strip()
     limit = int(data.get("limit") or 12)
 
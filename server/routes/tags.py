@@ -1,11 +1,14 @@
-from flask import Blueprint, jsonify
-from services.munro_service import list_tags_with_counts
+from flask import Blueprint, current_app
+from services.munro_service import tag_counts_json
+from utils.cache import catalog_conditional
 
 bp = Blueprint("tags", __name__)
 
 
 @bp.get("/tags")
+@catalog_conditional(max_age=300)
 def list_tags():
     """List all route tags with usage counts for filter UIs."""
 
-    return jsonify(list_tags_with_counts())
+    # Tags only change with the database file, which tag_counts_json already tracks.
+    return current_app.response_class(tag_counts_json(), mimetype=current_app.json.mimetype)
@@ -1,88 +1,68 @@
 """Utilities for collecting the list of Munros from WalkHighlands.
 
-This module drives a Selenium controlled Chrome browser to visit the
-WalkHighlands Munro index page, scroll the page so that all content loads, and
-then extract the name and canonical URL for each Munro.  The resulting list is
-persisted to JSON so it can be used by later scraping steps.  The module is
-written as a stand-alone script so it can be executed manually when refreshed
-data is required.
+This module fetches the WalkHighlands Munro index page over plain HTTP (the
+area tables are server-rendered, so no browser is needed), then extracts the
+name and canonical URL for each Munro.  The resulting list is persisted to
+JSON so it can be used by later scraping steps.  The module is written as a
+stand-alone script so it can be executed manually when refreshed data is
+required.
 """
 
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException
-from webdriver_manager.chrome import ChromeDriverManager
+import httpx
+import lxml.html
 import json
-import time
 
 URL = "https://www.walkhighlands.co.uk/munros/munros-a-z"
 OUTPUT_FILE = "munro_list.json"
+USER_AGENT = "Mozilla/5.0 (compatible; munro-scout scraper)"
+
+# Links in the body rows of the list and map tables.  Matches on ``td`` rather
+# than ``tbody`` because lxml, unlike a browser, does not insert a missing tbody.
+LINK_XPATH = '//*[@id="arealist" or @id="areamap"]//td//a'
 
 
 def fetch_munro_list():
     """Return a list of Munro metadata dictionaries scraped from WalkHighlands.
 
-    The function initialises a Chrome WebDriver, loads the main index page and
-    scrolls to the bottom to trigger lazy loading of the area tables.  Once the
-    anchor tags containing the Munro links appear, each element is processed to
-    build a canonical WalkHighlands URL.  Duplicate URLs are filtered out to
-    guard against the same Munro appearing in both the list and map tables.
+    The function downloads the main index page and parses the area tables with
+    lxml.  Each anchor tag is processed to build a canonical WalkHighlands URL.
+    Duplicate URLs are filtered out to guard against the same Munro appearing in
+    both the list and map tables.
 
     Returns:
         list[dict[str, str]]: Each dictionary contains ``name`` and ``url``
         keys describing a single Munro.
 
     Raises:
-        TimeoutException: If the Munro list fails to load within the configured
-        wait window.  The HTML at the point of failure is written to
-        ``debug_page.html`` for inspection.
+        httpx.HTTPError: If the index page cannot be fetched.
+        RuntimeError: If the page contains no Munro links.  The HTML is written
+        to ``debug_page.html`` for inspection.
     """
-    options = webdriver.ChromeOptions()
-    # ``--headless`` is left commented out so a developer can watch the browser
-    # interact with the site when debugging locally.  Uncomment the flag to run
-    # the scraper invisibly in automated environments.
-    # options.add_argument("--headless")  # enable for silent runs
-    options.add_argument("--no-sandbox")
-    options.add_argument("--disable-dev-shm-usage")
-
-    driver = webdriver.Chrome(
-        service=Service(ChromeDriverManager().install()), options=options
+    resp = httpx.get(
+        URL,
+        headers={"User-Agent": USER_AGENT},
+        timeout=30,
+        follow_redirects=True,
     )
-    driver.get(URL)
-
-    # The Munro listing loads additional rows as the page is scrolled.  A short
-    # scroll and pause ensures the content is fully rendered before searching
-    # for the anchor tags.
-    driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-    time.sleep(2)
-
-    try:
-        WebDriverWait(driver, 15).until(
-            EC.presence_of_element_located(
-                (By.CSS_SELECTOR, "#arealist tbody a, #areamap tbody a")
-            )
-        )
-    except TimeoutException:
-        print("❌ Timed out waiting for Munro links.")
+    resp.raise_for_status()
+
+    tree = lxml.html.fromstring(resp.content)
+    raw_links = tree.xpath(LINK_XPATH)
+    if not raw_links:
+        print("❌ No Munro links found on the page.")
         with open("debug_page.html", "w", encoding="utf-8") as f:
-            f.write(driver.page_source)
-        driver.quit()
-        raise
+            f.write(resp.text)
+        raise RuntimeError("Munro list tables not found on " + URL)
 
-    raw_links = driver.find_elements(
-        By.CSS_SELECTOR, "#arealist tbody a, #areamap tbody a"
-    )
     print(f"✅ Found {len(raw_links)} Munro links")
 
     munros = []
     seen = set()
 
     for link in raw_links:
-        name = link.text.strip()
-        href = link.get_attribute("href")
+        # Collapse whitespace the way a browser's rendered text would.
+        name = " ".join(link.text_content().split())
+        href = link.get("href")
 
         if name and href:
             slug = href.split("/")[-1].strip()
@@ -93,7 +73,6 @@ def fetch_munro_list():
                 seen.add(full_url)
                 print(f"🔗 {name} → {full_url}")
 
-    driver.quit()
     return munros
 
 
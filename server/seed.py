@@ -32,6 +32,11 @@ def to_nfc(s: str) -> str:
 
 APOS = {"\u2019": "'", "\u2018": "'", "\u2032": "'", "\u02bc": "'"}
 DASH = {"\u2013": "-", "\u2014": "-", "\u2212": "-"}
+# One translate table for every apostrophe/dash variant (single pass per string).
+_PUNCT = str.maketrans({**APOS, **DASH})
+_NON_ALNUM_RE = re.compile(r"[^0-9A-Za-z]+")
+_UNDERSCORES_RE = re.compile(r"_+")
+_WS_RE = re.compile(r"\s+")
 
 
 def clean_text(s: Any) -> Any:
@@ -40,12 +45,7 @@ def clean_text(s: Any) -> Any:
     if not isinstance(s, str):
         return s
     s = fix_mojibake(s)
-    s = to_nfc(s)
-    for k, v in APOS.items():
-        s = s.replace(k, v)
-    for k, v in DASH.items():
-        s = s.replace(k, v)
-    return s
+    return to_nfc(s).translate(_PUNCT)
 
 
 def clean_gpx(path: Any) -> Any:
@@ -60,8 +60,8 @@ def snake(s: str) -> str:
     """Convert arbitrary column headings into safe snake_case identifiers."""
 
     # Lowercase, replace non-alnum with underscores, then collapse multiples.
-    s = re.sub(r"[^0-9A-Za-z]+", "_", s).strip("_").lower()
-    s = re.sub(r"_+", "_", s)
+    s = _NON_ALNUM_RE.sub("_", s).strip("_").lower()
+    s = _UNDERSCORES_RE.sub("_", s)
     if not s:
         s = "field"
     return s
@@ -71,7 +71,7 @@ def canonicalize_name(name: str) -> str:
     """Standardise Munro names by trimming whitespace and normalising text."""
 
     s = clean_text(name)
-    s = re.sub(r"\s+", " ", s).strip()
+    s = _WS_RE.sub(" ", s).strip()
     return s
 
 
@@ -79,60 +79,43 @@ def canonical_key(name: str) -> str:
     """Create a case-folded lookup key that ignores punctuation variations."""
 
     s = canonicalize_name(name)
-    s = s.casefold()
     # unify apostrophes/dashes in key
-    s = (
-        s.replace("’", "'")
-        .replace("‘", "'")
-        .replace("–", "-")
-        .replace("—", "-")
-        .replace("−", "-")
-    )
-    return s
+    return s.casefold().translate(_PUNCT)
+
+
+# Numeric shapes checked before falling back to float() (inf/nan, digit underscores).
+_INT_RE = re.compile(r"[+-]?\d+(?:_\d+)*")
+_FLOAT_RE = re.compile(r"[+-]?(?:\d+\.\d*|\.\d+|\d+)(?:[eE][+-]?\d+)?")
 
 
 def infer_sql_type(values: List[Any]) -> str:
     """Infer a reasonable SQLite type from the dataset: INTEGER, REAL, TEXT."""
-    has_text = False
     has_real = False
-    has_int = True
     for v in values:
         if v is None or v == "":
             continue
         if isinstance(v, bool):
-            has_text = True  # store as TEXT/INTEGER? safer to treat as TEXT for now
-            continue
+            return "TEXT"  # store as TEXT/INTEGER? safer to treat as TEXT for now
         if isinstance(v, (int,)):
             continue
         if isinstance(v, float):
-            has_int = False
             has_real = True
             continue
-        # strings: try numeric parse
+        # strings: match numeric shapes; any text settles the column as TEXT
         if isinstance(v, str):
             vs = v.strip()
-            if vs == "":
+            if vs == "" or _INT_RE.fullmatch(vs):
                 continue
-            try:
-                int(vs)
-            except Exception:
+            if not _FLOAT_RE.fullmatch(vs):
                 try:
                     float(vs)
-                    has_int = False
-                    has_real = True
-                except Exception:
-                    has_text = True
+                except ValueError:
+                    return "TEXT"
+            has_real = True
             continue
         # any other type -> TEXT
-        has_text = True
-    if has_text:
         return "TEXT"
-    if has_real and not has_text:
-        return "REAL"
-    if has_int and not has_text and not has_real:
-        return "INTEGER"
-    # default
-    return "TEXT"
+    return "REAL" if has_real else "INTEGER"
 
 
 # ---------- Load & sanitize JSON ----------
@@ -212,9 +195,12 @@ for col in ordered_cols:
     values = [r.get(col) for r in rows]
     col_types[col] = infer_sql_type(values)
 
-# Build table
+# Build table: WAL + one explicit transaction, so the rebuild syncs once at COMMIT.
 conn = sqlite3.connect(DB_PATH)
+conn.execute("PRAGMA journal_mode=WAL")
+conn.execute("PRAGMA synchronous=NORMAL")
 c = conn.cursor()
+c.execute("BEGIN")
 c.execute("DROP TABLE IF EXISTS munros")
 
 cols_ddl = ["id INTEGER PRIMARY KEY AUTOINCREMENT"]
@@ -251,6 +237,11 @@ for r in rows:
     vals.append(tuple(row_vals))
 
 c.executemany(sql, vals)
+
+# Derived indexes (trigram over munros, R-Tree over munro_coords): drop them so the
+# API rebuilds them on next boot.
+c.execute("DROP TABLE IF EXISTS munro_trigram")
+c.execute("DROP TABLE IF EXISTS munro_rtree")
 conn.commit()
 conn.close()
 
@@ -0,0 +1,50 @@
+import hashlib
+import logging
+import sqlite3
+import time
+from typing import Any, Optional
+import orjson
+from flask import current_app
+from db import get_cache_db
+
+logger = logging.getLogger("chat_cache")
+
+# Bump when the intent prompt or the cached payload layout changes.
+INTENT_SCHEMA_VERSION = 3
+
+
+def cache_key(*parts: Any) -> str:
+    """Digest the inputs that fully determine a cached LLM result."""
+
+    raw = "\x1f".join(str(p) for p in parts)
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def get_cached(key: str) -> Optional[Any]:
+    """Return the unexpired payload stored under ``key``, or ``None``."""
+
+    cutoff = time.time() - current_app.config.get("CHAT_CACHE_TTL", 3600)
+    try:
+        row = get_cache_db().execute(
+            "SELECT payload FROM llm_cache WHERE key = ? AND created_at > ?",
+            (key, cutoff),
+        ).fetchone()
+    except sqlite3.Error:
+        logger.warning("[chat_cache] lookup failed; treating as a miss", exc_info=True)
+        return None
+    return orjson.loads(row[0]) if row else None
+
+
+def store(key: str, payload: Any) -> None:
+    """Persist ``payload`` under ``key``; failures only cost a future cache miss."""
+
+    try:
+        body = orjson.dumps(payload)
+        conn = get_cache_db()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, payload, created_at) VALUES (?, ?, ?)",
+                (key, body, time.time()),
+            )
+    except (sqlite3.Error, TypeError):
+        logger.warning("[chat_cache] store failed", exc_info=True)
@@ -1,7 +1,9 @@
 from typing import List, Dict, Any, Tuple, Optional
+import json
 import logging
+from functools import lru_cache
 from importlib import import_module
-from db import get_db
+from db import get_db, catalog_version
 from utils.query import norm_text
 
 logger = logging.getLogger("geo_service")
@@ -58,13 +60,15 @@ def geocode_scotland_first(location_query: str) -> Optional[Tuple[float, float,
     for candidate in _candidate_location_queries(location_query):
         try:
             # country_codes=gb gives a GB bias; bbox check enforces Scotland specifically
-            loc = rate_geocode(candidate, exactly_one=True, country_codes="gb")
+            coords = munro_coords.cached_geocode(
+                candidate, rate_geocode, country_codes="gb"
+            )
         except Exception:
-            loc = None
-        if not loc:
+            coords = None
+        if not coords:
             logger.info(f"[geo] no hit for '{candidate}'")
             continue
-        lat, lon = float(loc.latitude), float(loc.longitude)
+        lat, lon = coords
         inside = _within_bbox(lat, lon)
         logger.info(
             f"[geo] '{candidate}' -> ({lat:.5f},{lon:.5f}) | in_scotland={inside}"
@@ -74,28 +78,58 @@ def geocode_scotland_first(location_query: str) -> Optional[Tuple[float, float,
     return None
 
 
-def nearest_by_location(location_query: str, k: int = 20) -> List[Dict[str, Any]]:
+# Passed as ``resolved`` when the caller already knows the place doesn't geocode,
+# so nearest_by_location fails fast instead of repeating the (uncached) miss.
+LOCATION_MISS: Any = object()
+
+
+@lru_cache(maxsize=1024)
+def _resolve_location(key: str) -> Tuple[float, float, str]:
+    """Geocode a normalised place name; raises ``LookupError`` so misses aren't cached."""
+
+    res = geocode_scotland_first(key)
+    if not res:
+        raise LookupError(key)
+    return res
+
+
+def resolve_location(location_query: str) -> Optional[Tuple[float, float, str]]:
+    """Return ``(lat, lon, resolved_query)`` for a Scottish place, memoised in-process."""
+
+    key = " ".join((location_query or "").split()).casefold()
+    if not key:
+        return None
+    try:
+        return _resolve_location(key)
+    except LookupError:
+        return None
+
+
+def nearest_by_location(
+    location_query: str,
+    k: int = 20,
+    resolved: Optional[Tuple[float, float, str]] = None,
+) -> List[Dict[str, Any]]:
     """
     Strict Scotland path:
-    - Geocode with Scotland bias and bbox check
-    - If not in Scotland, raise ValueError
+    - Geocode with Scotland bias and bbox check (skipped when ``resolved`` is given)
+    - If not in Scotland (or ``resolved`` is LOCATION_MISS), raise ValueError
     - Otherwise compute nearest via coords table
     """
-    res = geocode_scotland_first(location_query)
+    if resolved is LOCATION_MISS:
+        res = None
+    else:
+        res = resolved or resolve_location(location_query)
     if not res:
         raise ValueError(
             "Location not recognised in Scotland. Try a more specific place (e.g. 'Glen Coe, Scotland')."
         )
-    lat, lon, resolved = res
-    logger.info(f"[geo] using resolved location '{resolved}'")
+    lat, lon, resolved_query = res
+    logger.info(f"[geo] using resolved location '{resolved_query}'")
 
     # Use the coords table on the validated point
-    df = munro_coords.nearest_munros_to_point(lat, lon, k=max(1, int(k or 20)))
-    named = [
-        {"name": r["name"], "distance_km": float(r["distance_km"])}
-        for _, r in df.iterrows()
-    ]
-    return named
+    nearest = munro_coords.nearest_munros_to_point(lat, lon, k=max(1, int(k or 20)))
+    return [{"name": r["name"], "distance_km": r["distance_km"]} for r in nearest]
 
 
 # -------- DB mapping helpers (carry route_distance/route_time if available) --------
@@ -110,10 +144,10 @@ def _ensure_schema_flags() -> None:
     if _HAS_DISTANCE is not None and _HAS_TIME is not None:
         return
     try:
-        with get_db() as conn:
-            cols = [
-                r["name"] for r in conn.execute("PRAGMA table_info(munros)").fetchall()
-            ]
+        conn = get_db()
+        cols = [
+            r["name"] for r in conn.execute("PRAGMA table_info(munros)").fetchall()
+        ]
         _HAS_DISTANCE = "distance" in cols
         _HAS_TIME = "time" in cols
     except Exception:
@@ -145,53 +179,65 @@ def _select_row(conn, name_like: Optional[str] = None, exact: Optional[str] = No
     return None
 
 
+@lru_cache(maxsize=1)
+def _loose_names(version) -> Dict[str, str]:
+    """Map folded Munro names to their stored spelling for one catalog version."""
+
+    return {norm_text(r["name"]): r["name"] for r in get_db().execute("SELECT name FROM munros")}
+
+
 def _map_names_to_db_rows(named: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     """Translate name/distance pairs into enriched database-backed records."""
 
     if not named:
         return []
-    with get_db() as conn:
-        # Preload for fast exact/loose lookups
-        _ensure_schema_flags()
-        base_cols = ["id", "name", "summary", "description"]
-        if _HAS_DISTANCE:
-            base_cols.append("distance")
-        if _HAS_TIME:
-            base_cols.append("time")
-        col_sql = ", ".join(base_cols)
-
-        all_rows = conn.execute(f"SELECT {col_sql} FROM munros").fetchall()
-        # Convert to dicts for Python-side indexing
-        all_dicts = [dict(r) for r in all_rows]
-        idx_exact = {r["name"]: r for r in all_dicts}
-        idx_loose = {norm_text(r["name"]): r for r in all_dicts}
-
-        out: List[Dict[str, Any]] = []
-        for item in named:
-            nm = item["name"]
-            dist_user = item["distance_km"]
-
-            row = idx_exact.get(nm) or idx_loose.get(norm_text(nm))
-            if row is None:
-                got = _select_row(conn, name_like=nm)
-                row = dict(got) if got else None
-
-            if row:
-                out.append(
-                    {
-                        "id": row["id"],
-                        "name": row["name"],
-                        "summary": row.get("summary"),
-                        "description": row.get("description") or "",
-                        "distance_km": dist_user,  # distance from user location (for ranking)
-                        "route_distance": row.get(
-                            "distance"
-                        ),  # route length from DB (km) if column exists
-                        "route_time": row.get(
-                            "time"
-                        ),  # route time from DB (hours) if column exists
-                    }
-                )
+    conn = get_db()
+    _ensure_schema_flags()
+    base_cols = ["id", "name", "summary", "description"]
+    if _HAS_DISTANCE:
+        base_cols.append("distance")
+    if _HAS_TIME:
+        base_cols.append("time")
+    rows_sql = (
+        f"SELECT {', '.join(base_cols)} FROM munros "
+        "WHERE name IN (SELECT value FROM json_each(?))"
+    )
+
+    # Fetch only the requested rows through idx_munros_name: each name as given
+    # plus its stored spelling from the cached loose index (for variants).
+    loose = _loose_names(catalog_version())
+    names = {item["name"] for item in named}
+    variants = {nm: loose.get(norm_text(nm)) for nm in names}
+    lookup = names | {v for v in variants.values() if v}
+    fetched = conn.execute(rows_sql, (json.dumps(sorted(lookup)),)).fetchall()
+    by_name = {r["name"]: dict(r) for r in fetched}
+
+    out: List[Dict[str, Any]] = []
+    for item in named:
+        nm = item["name"]
+        dist_user = item["distance_km"]
+
+        row = by_name.get(nm) or by_name.get(variants[nm])
+        if row is None:
+            got = _select_row(conn, name_like=nm)
+            row = dict(got) if got else None
+
+        if row:
+            out.append(
+                {
+                    "id": row["id"],
+                    "name": row["name"],
+                    "summary": row.get("summary"),
+                    "description": row.get("description") or "",
+                    "distance_km": dist_user,  # distance from user location (for ranking)
+                    "route_distance": row.get(
+                        "distance"
+                    ),  # route length from DB (km) if column exists
+                    "route_time": row.get(
+                        "time"
+                    ),  # route time from DB (hours) if column exists
+                }
+            )
     return out
 
 
@@ -201,11 +247,13 @@ def attach_tags(rows: List[Dict[str, Any]]) -> None:
     if not rows:
         return
     ids = [r["id"] for r in rows]
-    with get_db() as conn:
-        tag_rows = conn.execute(
-            f"SELECT munro_id, tag FROM munro_tags WHERE munro_id IN ({','.join('?' for _ in ids)})",
-            ids,
-        ).fetchall()
+    conn = get_db()
+    # Ids bound as one JSON array: a single SQL text, so the prepared statement is reused.
+    tag_rows = conn.execute(
+        "SELECT munro_id, tag FROM munro_tags "
+        "WHERE munro_id IN (SELECT value FROM json_each(?))",
+        (json.dumps(ids),),
+    ).fetchall()
     tmap: Dict[int, List[str]] = {}
     for tr in tag_rows:
         tmap.setdefault(tr["munro_id"], []).append(tr["tag"])
@@ -0,0 +1,113 @@
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from queue import Empty, SimpleQueue
+from typing import Any, Dict, List, Tuple
+import orjson
+from services.llm_cache import LLM_CACHE_TTL, cached_invoke, llm_cache, message_key
+from utils.llm_json import parse_json_object
+
+logger = logging.getLogger("llm_batcher")
+
+_BATCH_SUFFIX = """
+You will receive several numbered user messages. Handle each one independently as
+described above and return {"results": [...]} with exactly one object per message,
+in the same order."""
+
+# (system prompt, user message, cache key, future)
+_Item = Tuple[str, str, str, Future]
+
+
+class JSONBatcher:
+    """Coalesces concurrent JSON-mode calls that share a system prompt into one LLM request.
+
+    Each caller gets a future resolving to its own JSON object text, exactly as a
+    single ``cached_invoke(..., "json")`` would return it, and the per-message
+    results are cached under the same keys.
+    """
+
+    def __init__(self, llm, model: str, max_batch: int = 8, max_wait: float = 0.02):
+        self.llm = llm
+        self.model = model
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._q: "SimpleQueue[_Item]" = SimpleQueue()
+        self._worker = threading.Thread(target=self._run, name="llm-batcher", daemon=True)
+        self._worker.start()
+
+    def submit(self, messages: List[Dict[str, Any]]) -> "Future[str]":
+        """Queue a ``[system, user]`` message pair; cached replies resolve immediately."""
+
+        fut: "Future[str]" = Future()
+        key = message_key(self.model, messages, "json")
+        content = llm_cache.get(key)
+        if content is not None:
+            fut.set_result(content)
+        else:
+            self._q.put((messages[0]["content"], messages[1]["content"], key, fut))
+        return fut
+
+    def _run(self) -> None:
+        """Collect up to ``max_batch`` items or ``max_wait`` seconds, then dispatch."""
+
+        while True:
+            batch = [self._q.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._q.get(timeout=remaining))
+                except Empty:
+                    break
+            groups: Dict[str, List[_Item]] = {}
+            for item in batch:
+                groups.setdefault(item[0], []).append(item)
+            for items in groups.values():
+                self._dispatch(items)
+
+    def _single(self, item: _Item) -> None:
+        """Resolve one item with its own un-batched call."""
+
+        system, user, _, fut = item
+        try:
+            messages = [
+                {"role": "system", "content": system},
+                {"role": "user", "content": user},
+            ]
+            fut.set_result(cached_invoke(self.llm, messages, self.model, "json"))
+        except Exception as e:
+            fut.set_exception(e)
+
+    def _dispatch(self, items: List[_Item]) -> None:
+        """Send one numbered prompt for ``items`` and fan the results back out."""
+
+        if len(items) == 1:
+            self._single(items[0])
+            return
+        numbered = "\n".join(f"{i}) {item[1]}" for i, item in enumerate(items, 1))
+        try:
+            raw = self.llm.invoke(
+                [
+                    {"role": "system", "content": items[0][0] + _BATCH_SUFFIX},
+                    {"role": "user", "content": numbered},
+                ]
+            ).content
+        except Exception as e:
+            for item in items:
+                item[3].set_exception(e)
+            return
+        results = (parse_json_object(raw) or {}).get("results")
+        if not isinstance(results, list) or len(results) != len(items):
+            # Misaligned batch reply: answer each message on its own instead.
+            logger.warning("batched reply had %s results for %d messages",
+                           len(results) if isinstance(results, list) else "no", len(items))
+            for item in items:
+                self._single(item)
+            return
+        for item, obj in zip(items, results):
+            content = orjson.dumps(obj).decode()
+            llm_cache.set(item[2], content, LLM_CACHE_TTL)
+            item[3].set_result(content)
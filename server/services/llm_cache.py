@@ -0,0 +1,107 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, List, Optional, Protocol, Tuple
+import orjson
+
+# Seconds an LLM reply stays reusable; only deterministic (temperature 0) calls are cached.
+LLM_CACHE_TTL = 3600
+
+
+class ResponseCache(Protocol):
+    """Minimal store interface so an external cache (e.g. Redis) can replace the LRU."""
+
+    def get(self, key: str) -> Optional[str]: ...
+
+    def set(self, key: str, value: str, ttl: float) -> None: ...
+
+
+class LRUResponseCache:
+    """Thread-safe in-process LRU of LLM reply texts with per-entry expiry."""
+
+    def __init__(self, maxsize: int = 512):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # key -> (expires_at, content)
+        self._data: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the live entry for ``key`` (marking it recently used) or ``None``."""
+
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                self._data.pop(key, None)
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: str, value: str, ttl: float) -> None:
+        """Store ``value`` for ``ttl`` seconds, evicting the least recently used entry."""
+
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters and current size, for observability logs."""
+
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._data)}
+
+
+llm_cache = LRUResponseCache()
+
+
+def message_key(model: str, messages: List[Dict[str, Any]], mode: str = "text") -> str:
+    """SHA-256 over everything that determines a temperature-0 reply."""
+
+    raw = orjson.dumps(
+        {"model": model, "mode": mode, "messages": messages, "T": 0},
+        option=orjson.OPT_SORT_KEYS,
+    )
+    return hashlib.sha256(raw).hexdigest()
+
+
+def cached_invoke(
+    llm, messages: List[Dict[str, Any]], model: str, mode: str = "text"
+) -> str:
+    """Return ``llm.invoke(messages).content`` (stripped), reusing identical prompts.
+
+    Takes ``model`` explicitly so it can run on worker threads without an app context.
+    """
+
+    key = message_key(model, messages, mode)
+    content = llm_cache.get(key)
+    if content is None:
+        content = llm.invoke(messages).content.strip()
+        llm_cache.set(key, content, LLM_CACHE_TTL)
+    return content
+
+
+def cached_stream(
+    llm, messages: List[Dict[str, Any]], model: str, mode: str = "text"
+) -> Iterator[str]:
+    """Yield reply tokens from ``llm.stream``; a cached reply is replayed as one chunk.
+
+    The joined reply is cached only once the stream has completed.
+    """
+
+    key = message_key(model, messages, mode)
+    content = llm_cache.get(key)
+    if content is not None:
+        yield content
+        return
+    parts = []
+    for chunk in llm.stream(messages):
+        if chunk.content:
+            parts.append(chunk.content)
+            yield chunk.content
+    llm_cache.set(key, "".join(parts).strip(), LLM_CACHE_TTL)
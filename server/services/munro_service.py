@@ -1,11 +1,35 @@
-from typing import List, Dict, Any
-from db import get_db
+from typing import Any, Dict, Iterator, List, Tuple
+import orjson
+from db import get_db, catalog_version
 
+# Public columns of ``munros`` (everything except the internal normalized_name).
+_MUNRO_COLS = (
+    "id", "name", "summary", "description", "distance", "time", "grade", "bog",
+    "start", "title", "terrain", "public_transport", "gpx_file", "url",
+)
+_MUNRO_SELECT = f"SELECT {', '.join(_MUNRO_COLS)} FROM munros"
+_MUNRO_BY_ID_SQL = f"{_MUNRO_SELECT} WHERE id = ?"
+
+_TAG_COUNTS_SQL = """
+    SELECT tag, COUNT(*) AS n
+    FROM munro_tags
+    GROUP BY tag
+    ORDER BY n DESC, tag ASC
+"""
+
+# Rows serialised per chunk when streaming filtered listings.
+_STREAM_BATCH = 64
+
+# Serialised unfiltered Munro list, rebuilt whenever the database file changes.
+_ALL_MUNROS_JSON: Dict[str, Any] = {"version": None, "body": b""}
+# Serialised tag counts, rebuilt on the same database-change signal.
+_TAG_COUNTS_JSON: Dict[str, Any] = {"version": None, "body": b""}
 
-def list_munros(grade=None, bog=None, search=None, mid=None) -> List[Dict[str, Any]]:
-    """Retrieve Munros filtered by grade/bog/search/id criteria."""
 
-    base_sql = "SELECT * FROM munros WHERE 1=1"
+def _munro_query(grade=None, bog=None, search=None, mid=None) -> Tuple[str, List[Any]]:
+    """Build the SQL and parameters for a filtered Munro listing."""
+
+    base_sql = f"{_MUNRO_SELECT} WHERE 1=1"
     clauses, params = [], []
 
     if mid is not None:
@@ -17,7 +41,14 @@ def list_munros(grade=None, bog=None, search=None, mid=None) -> List[Dict[str, A
     if bog is not None:
         clauses.append("AND bog <= ?")
         params.append(bog)
-    if search:
+    if search and len(search) >= 3:
+        # Substring search through the trigram index (same columns as the LIKE scan).
+        clauses.append(
+            "AND id IN (SELECT rowid FROM munro_trigram WHERE munro_trigram MATCH ?)"
+        )
+        params.append('"' + search.replace('"', '""') + '"')
+    elif search:
+        # Too short for trigrams; fall back to scanning.
         clauses.append("""
             AND (
                 name LIKE ? COLLATE NOCASE
@@ -28,38 +59,70 @@ def list_munros(grade=None, bog=None, search=None, mid=None) -> List[Dict[str, A
         like = f"%{search}%"
         params.extend([like, like, like])
 
-    sql = " ".join([base_sql, *clauses])
-    with get_db() as conn:
-        rows = conn.execute(sql, params).fetchall()
+    # Id order, as the plain table scan returned it; clients take data[0] as the match.
+    return " ".join([base_sql, *clauses, "ORDER BY id"]), params
+
+
+def list_munros(grade=None, bog=None, search=None, mid=None) -> List[Dict[str, Any]]:
+    """Retrieve Munros filtered by grade/bog/search/id criteria."""
 
-    out = []
-    for r in rows:
-        d = dict(r)
-        d.pop("normalized_name", None)
-        out.append(d)
-    return out
+    sql, params = _munro_query(grade=grade, bog=bog, search=search, mid=mid)
+    rows = get_db().execute(sql, params).fetchall()
+    return [dict(zip(_MUNRO_COLS, r)) for r in rows]
+
+
+def iter_munros_json(grade=None, bog=None, search=None, mid=None) -> Iterator[bytes]:
+    """Yield a filtered Munro list as a JSON array, a batch of rows at a time."""
+
+    sql, params = _munro_query(grade=grade, bog=bog, search=search, mid=mid)
+    cur = get_db().execute(sql, params)
+    sep = b"["
+    while True:
+        rows = cur.fetchmany(_STREAM_BATCH)
+        if not rows:
+            break
+        parts = []
+        for r in rows:
+            parts.append(sep)
+            parts.append(orjson.dumps(dict(zip(_MUNRO_COLS, r))))
+            sep = b","
+        yield b"".join(parts)
+    # An empty result never emitted the opening bracket.
+    yield b"]" if sep == b"," else b"[]"
+
+
+def all_munros_json() -> bytes:
+    """Return the full Munro list as pre-serialised JSON bytes."""
+
+    get_db()  # opening the connection may create the WAL file, so do it first
+    version = catalog_version()
+    if _ALL_MUNROS_JSON["version"] != version:
+        _ALL_MUNROS_JSON["body"] = orjson.dumps(list_munros())
+        _ALL_MUNROS_JSON["version"] = version
+    return _ALL_MUNROS_JSON["body"]
 
 
 def get_munro(mid: int) -> Dict[str, Any] | None:
     """Fetch a single Munro row by id, omitting internal fields."""
 
-    with get_db() as conn:
-        row = conn.execute("SELECT * FROM munros WHERE id = ?", (mid,)).fetchone()
-    if not row:
-        return None
-    d = dict(row)
-    d.pop("normalized_name", None)
-    return d
+    row = get_db().execute(_MUNRO_BY_ID_SQL, (mid,)).fetchone()
+    return dict(zip(_MUNRO_COLS, row)) if row else None
 
 
 def list_tags_with_counts() -> List[Dict[str, Any]]:
     """Return all tags with their usage frequency for filter displays."""
 
-    with get_db() as conn:
-        rows = conn.execute("""
-            SELECT tag, COUNT(*) AS n
-            FROM munro_tags
-            GROUP BY tag
-            ORDER BY n DESC, tag ASC
-        """).fetchall()
+    conn = get_db()
+    rows = conn.execute(_TAG_COUNTS_SQL).fetchall()
     return [{"tag": r["tag"], "count": r["n"]} for r in rows]
+
+
+def tag_counts_json() -> bytes:
+    """Return the tag counts as pre-serialised JSON bytes."""
+
+    get_db()
+    version = catalog_version()
+    if _TAG_COUNTS_JSON["version"] != version:
+        _TAG_COUNTS_JSON["body"] = orjson.dumps(list_tags_with_counts())
+        _TAG_COUNTS_JSON["version"] = version
+    return _TAG_COUNTS_JSON["body"]
@@ -1,13 +1,22 @@
+import json
 import logging
-from typing import Any, Dict, List, Optional
-from db import get_db
+import re
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+from flask import current_app
+from db import get_db, catalog_version
 from utils.query import (
     expand_query_for_fts,
-    build_like_terms,
+    build_trigram_query,
     normalize_grade_max,
     norm_text,
 )
-from extensions.llm import get_llm
+from utils.llm_json import parse_json_object
+from extensions.llm import get_json_llm
+from services.chat_cache import cache_key, get_cached, store
 from services.geo_service import nearest_by_location, _map_names_to_db_rows, attach_tags
 
 logger = logging.getLogger("search_service")
@@ -24,10 +33,10 @@ def _ensure_schema_flags() -> None:
     if _HAS_DISTANCE is not None and _HAS_TIME is not None:
         return
     try:
-        with get_db() as conn:
-            cols = [
-                r["name"] for r in conn.execute("PRAGMA table_info(munros)").fetchall()
-            ]
+        conn = get_db()
+        cols = [
+            r["name"] for r in conn.execute("PRAGMA table_info(munros)").fetchall()
+        ]
         _HAS_DISTANCE = "distance" in cols
         _HAS_TIME = "time" in cols
     except Exception:
@@ -36,28 +45,217 @@ def _ensure_schema_flags() -> None:
         _HAS_TIME = False
 
 
-def _add_numeric_filters(
-    wheres: List[str],
-    where_params: List[Any],
+def _numeric_shape(
     dist_min: Optional[float],
     dist_max: Optional[float],
     time_min: Optional[float],
     time_max: Optional[float],
-) -> None:
-    """Append numeric filter SQL to WHERE (only if columns exist)."""
+) -> Tuple[bool, bool, bool, bool]:
+    """Flag which numeric filters apply (only if their columns exist)."""
     _ensure_schema_flags()
-    if _HAS_DISTANCE and dist_min is not None:
-        wheres.append("(m.distance IS NULL OR m.distance >= ?)")
-        where_params.append(float(dist_min))
-    if _HAS_DISTANCE and dist_max is not None:
-        wheres.append("(m.distance IS NULL OR m.distance <= ?)")
-        where_params.append(float(dist_max))
-    if _HAS_TIME and time_min is not None:
-        wheres.append("(m.time IS NULL OR m.time >= ?)")
-        where_params.append(float(time_min))
-    if _HAS_TIME and time_max is not None:
-        wheres.append("(m.time IS NULL OR m.time <= ?)")
-        where_params.append(float(time_max))
+    return (
+        bool(_HAS_DISTANCE) and dist_min is not None,
+        bool(_HAS_DISTANCE) and dist_max is not None,
+        bool(_HAS_TIME) and time_min is not None,
+        bool(_HAS_TIME) and time_max is not None,
+    )
+
+
+def _numeric_wheres(numeric: Tuple[bool, bool, bool, bool]) -> List[str]:
+    """Return the WHERE fragments for the numeric filters flagged in ``numeric``."""
+
+    fragments = (
+        "(m.distance IS NULL OR m.distance >= ?)",
+        "(m.distance IS NULL OR m.distance <= ?)",
+        "(m.time IS NULL OR m.time >= ?)",
+        "(m.time IS NULL OR m.time <= ?)",
+    )
+    return [frag for frag, on in zip(fragments, numeric) if on]
+
+
+# ---------- Cached SQL templates (one per filter shape) ----------
+
+# Per-row tag list via the (munro_id, tag) key; char(31) (unit separator) can't occur in a tag.
+_TAGS_PACKED = (
+    "COALESCE((SELECT GROUP_CONCAT(tag, char(31)) FROM munro_tags "
+    "WHERE munro_id = m.id), '') AS _tags_packed"
+)
+
+# bm25 column weights for munro_fts(name, summary, description, keywords).
+_FTS_WEIGHTS = "10.0, 3.0, 1.0, 3.0"
+
+
+@lru_cache(maxsize=64)
+def _build_filters(
+    n_include: int,
+    has_exclude: bool,
+    has_bog: bool,
+    has_grade: bool,
+    numeric: Tuple[bool, bool, bool, bool],
+) -> Tuple[str, str]:
+    """Return the (joins, where) SQL shared by every search pass.
+
+    ``n_include`` is 0, 1 or 2 (meaning "two or more"). Multi-tag lists bind as
+    JSON arrays expanded by json_each, so the SQL text does not vary with the
+    number of tags. Placeholders bind in order: exclude JSON, the include tag
+    (single) or include JSON plus its count (multi), bog, grade, then numerics.
+    """
+
+    joins, wheres = [], ["1=1"]
+
+    if has_exclude:
+        # Anti-join: keep rows with no excluded tag, probing the (munro_id, tag) key.
+        joins.append(
+            "LEFT JOIN munro_tags t_ex ON t_ex.munro_id = m.id "
+            "AND t_ex.tag IN (SELECT value FROM json_each(?))"
+        )
+        wheres.append("t_ex.munro_id IS NULL")
+
+    if n_include == 1:
+        # (munro_id, tag) is unique, so one tag needs no grouping to be exact.
+        wheres.append("m.id IN (SELECT munro_id FROM munro_tags WHERE tag = ?)")
+    elif n_include:
+        # AND-semantics resolved on munro_tags alone (tag, munro_id index), not the joined rows.
+        # CROSS JOIN keeps json_each as the driver so each tag probes the (tag, munro_id) index.
+        wheres.append(
+            "m.id IN (SELECT t.munro_id FROM json_each(?) AS j "
+            "CROSS JOIN munro_tags t ON t.tag = j.value "
+            "GROUP BY t.munro_id HAVING COUNT(DISTINCT t.tag) = ?)"
+        )
+
+    if has_bog:
+        wheres.append("(m.bog IS NULL OR m.bog <= ?)")
+    if has_grade:
+        wheres.append("(m.grade IS NULL OR m.grade <= ?)")
+    wheres.extend(_numeric_wheres(numeric))
+
+    return " ".join(joins), " AND ".join(wheres)
+
+
+@lru_cache(maxsize=128)
+def _build_search_sql(passes: Tuple[bool, bool, bool], *shape) -> str:
+    """Return one statement running the FTS, trigram and tag-only passes as fallbacks.
+
+    ``passes`` flags which of the three passes apply. Each later pass is gated on
+    the earlier ones being empty, so a fallback only scans when it is needed.
+    """
+
+    joins, where = _build_filters(*shape)
+    cols = "m.id, m.name, m.summary, m.description"
+    ctes, done = [], []
+
+    def gate() -> str:
+        # A zero-or-one row driver: CROSS JOIN keeps it as the outer loop, so the
+        # fallback's scan never starts once an earlier pass has produced rows.
+        if not done:
+            return ""
+        empty = " AND ".join(f"NOT EXISTS (SELECT 1 FROM {p})" for p in done)
+        return f"(SELECT 1 WHERE {empty}) AS gate CROSS JOIN "
+
+    if passes[0]:
+        # bm25() is lower-is-better; the inner LIMIT caps the MATCH scan when unfiltered.
+        # bm25 yields NULL (NaN) if the index's row-count stats drift, so unscored hits sort last.
+        # Ties break on name then id (as the outer ORDER BY does) so the cap keeps a stable set.
+        ctes.append(f"""
+        f AS MATERIALIZED (
+          SELECT munro_fts.rowid AS docid,
+                 COALESCE(bm25(munro_fts, {_FTS_WEIGHTS}), 0.0) AS score
+          FROM munro_fts
+          JOIN munros fm ON fm.id = munro_fts.rowid
+          WHERE munro_fts MATCH ?
+          ORDER BY score, fm.name, fm.id
+          LIMIT ?
+        ),
+        p1 AS MATERIALIZED (
+          SELECT {cols}, f.score AS rank, {_TAGS_PACKED}
+          FROM f
+          JOIN munros m ON m.id = f.docid
+          {joins}
+          WHERE {where}
+          ORDER BY rank ASC, m.name ASC, m.id ASC
+          LIMIT ?
+        )""")
+        done.append("p1")
+
+    if passes[1]:
+        ctes.append(f"""
+        s AS MATERIALIZED (
+          SELECT munro_trigram.rowid AS docid
+          FROM {gate()}munro_trigram
+          WHERE munro_trigram MATCH ?
+        ),
+        p2 AS MATERIALIZED (
+          SELECT {cols}, 1000.0 AS rank, {_TAGS_PACKED}
+          FROM s
+          JOIN munros m ON m.id = s.docid
+          {joins}
+          WHERE {where}
+          ORDER BY m.name ASC
+          LIMIT ?
+        )""")
+        done.append("p2")
+
+    if passes[2]:
+        ctes.append(f"""
+        p3 AS MATERIALIZED (
+          SELECT {cols}, 2000.0 AS rank, {_TAGS_PACKED}
+          FROM {gate()}munros m
+          {joins}
+          WHERE {where}
+          ORDER BY m.name ASC
+          LIMIT ?
+        )""")
+        done.append("p3")
+
+    union = " UNION ALL ".join(f"SELECT * FROM {p}" for p in done)
+    return f"""
+        WITH {",".join(ctes)}
+        {union}
+        ORDER BY rank ASC, name ASC, id ASC
+    """
+
+
+# ---------- Result cache ----------
+
+# The intent parser emits a small tag vocabulary, so identical searches recur often.
+_SEARCH_TTL = 600.0
+_SEARCH_MAX_ENTRIES = 1024
+_search_lock = threading.Lock()
+# key -> (expires_at, sql, params, results, context)
+_search_cache: Dict[tuple, Tuple[float, str, list, list, str]] = {}
+
+
+def _cached_search(key: tuple):
+    """Return a live cache entry for ``key`` or ``None``."""
+
+    hit = _search_cache.get(key)
+    if hit is None or hit[0] <= time.monotonic():
+        return None
+    return hit
+
+
+def _store_search(key: tuple, sql: str, params: list, results: list, context: str) -> None:
+    """Remember a search outcome, evicting the oldest entry when full."""
+
+    with _search_lock:
+        if len(_search_cache) >= _SEARCH_MAX_ENTRIES:
+            _search_cache.pop(next(iter(_search_cache)), None)
+        _search_cache[key] = (time.monotonic() + _SEARCH_TTL, sql, params, results, context)
+
+
+def format_context(results: List[Dict[str, Any]], with_distance: bool = False) -> str:
+    """Render results as the bullet context given to the answer-synthesis prompt."""
+
+    lines = []
+    for r in results:
+        dist_txt = ""
+        if with_distance:
+            dist = r.get("distance_km")
+            if isinstance(dist, (int, float)):
+                dist_txt = f" (~{dist:.1f} km)"
+        tag_str = ", ".join(r.get("tags", []))
+        lines.append(f"- {r['name']}{dist_txt}: {tag_str}\n  {r['snippet']}")
+    return "\n".join(lines)
 
 
 # ---------- Core search (3-pass) ----------
@@ -67,8 +265,9 @@ def search_core(payload: Dict[str, Any]) -> Dict[str, Any]:
     """Run the multi-pass text search pipeline and return structured results."""
 
     raw_query = (payload.get("query") or "").strip()
-    include_tags = payload.get("include_tags") or []
-    exclude_tags = payload.get("exclude_tags") or []
+    # Order-preserving dedupe: repeated tags add nothing to either filter.
+    include_tags = list(dict.fromkeys(payload.get("include_tags") or []))
+    exclude_tags = list(dict.fromkeys(payload.get("exclude_tags") or []))
     bog_max = payload.get("bog_max")
     grade_max = normalize_grade_max(payload.get("grade_max"))
     limit = int(payload.get("limit") or 12)
@@ -79,211 +278,51 @@ def search_core(payload: Dict[str, Any]) -> Dict[str, Any]:
     time_min = payload.get("time_min_h")
     time_max = payload.get("time_max_h")
 
-    with get_db() as conn:
-        c = conn.cursor()
-
-        rows = []
-        used_sql, used_params = "", []
-        fts_query = expand_query_for_fts(raw_query)
-
-        # ---------- Pass 1: FTS (no bm25) ----------
-        if fts_query:
-            wheres, joins = ["1=1"], []
-            where_params, having_clause, having_params = [], "", []
-
-            if include_tags:
-                joins.append("JOIN munro_tags t_in ON t_in.munro_id = m.id")
-                wheres.append(f"t_in.tag IN ({','.join('?' for _ in include_tags)})")
-                where_params.extend(include_tags)
-                having_clause = (
-                    f"HAVING COUNT(DISTINCT CASE WHEN t_in.tag IN ({','.join('?' for _ in include_tags)}) "
-                    f"THEN t_in.tag END) = ?"
-                )
-                having_params.extend(include_tags)
-                having_params.append(len(include_tags))
-
-            exclude_sql, exclude_params = "", []
-            if exclude_tags:
-                exclude_sql = f"""
-                    AND m.id NOT IN (
-                        SELECT munro_id FROM munro_tags
-                        WHERE tag IN ({",".join("?" for _ in exclude_tags)})
-                    )
-                """
-                exclude_params = exclude_tags[:]
-
-            # Numeric filters (WHERE)
-            if bog_max is not None:
-                wheres.append("(m.bog IS NULL OR m.bog <= ?)")
-                where_params.append(bog_max)
-            if grade_max is not None:
-                wheres.append("(m.grade IS NULL OR m.grade <= ?)")
-                where_params.append(grade_max)
-            _add_numeric_filters(
-                wheres, where_params, dist_min, dist_max, time_min, time_max
-            )
-
-            sql_fts = f"""
-                WITH f AS (
-                  SELECT rowid AS docid
-                  FROM munro_fts
-                  WHERE munro_fts MATCH ?
-                )
-                SELECT m.id, m.name, m.summary, m.description,
-                       0.0 AS rank
-                FROM f
-                JOIN munros m ON m.id = f.docid
-                {" ".join(joins) if joins else ""}
-                WHERE {" AND ".join(wheres)}
-                {exclude_sql}
-                GROUP BY m.id
-                {having_clause}
-                ORDER BY m.name ASC
-                LIMIT ?
-            """
-            params_fts = (
-                [fts_query] + where_params + exclude_params + having_params + [limit]
-            )
-            rows = c.execute(sql_fts, params_fts).fetchall()
-            used_sql, used_params = sql_fts, params_fts
-
-        # ---------- Pass 2: LIKE fallback ----------
-        if not rows and raw_query:
-            like_terms = build_like_terms(raw_query)
-            if like_terms:
-                wheres2, joins2 = ["1=1"], []
-                where_params2, having2, having_params2 = [], "", []
-
-                if include_tags:
-                    joins2.append("JOIN munro_tags t_in ON t_in.munro_id = m.id")
-                    wheres2.append(
-                        f"t_in.tag IN ({','.join('?' for _ in include_tags)})"
-                    )
-                    where_params2.extend(include_tags)
-                    having2 = (
-                        f"HAVING COUNT(DISTINCT CASE WHEN t_in.tag IN ({','.join('?' for _ in include_tags)}) "
-                        f"THEN t_in.tag END) = ?"
-                    )
-                    having_params2.extend(include_tags)
-                    having_params2.append(len(include_tags))
-
-                exclude_sql2, exclude_params2 = "", []
-                if exclude_tags:
-                    exclude_sql2 = f"""
-                        AND m.id NOT IN (
-                            SELECT munro_id FROM munro_tags
-                            WHERE tag IN ({",".join("?" for _ in exclude_tags)})
-                        )
-                    """
-                    exclude_params2 = exclude_tags[:]
-
-                # LIKE blocks
-                block = "m.name LIKE ? COLLATE NOCASE OR m.summary LIKE ? COLLATE NOCASE OR m.description LIKE ? COLLATE NOCASE"
-                blocks, like_params = [], []
-                for term in like_terms:
-                    blocks.append(f"({block})")
-                    like_params.extend([term, term, term])
-                wheres2.append("(" + " OR ".join(blocks) + ")")
-                where_params2.extend(like_params)
-
-                # Numeric filters (WHERE)
-                if bog_max is not None:
-                    wheres2.append("(m.bog IS NULL OR m.bog <= ?)")
-                    where_params2.append(bog_max)
-                if grade_max is not None:
-                    wheres2.append("(m.grade IS NULL OR m.grade <= ?)")
-                    where_params2.append(grade_max)
-                _add_numeric_filters(
-                    wheres2, where_params2, dist_min, dist_max, time_min, time_max
-                )
-
-                sql_like = f"""
-                    SELECT m.id, m.name, m.summary, m.description,
-                           1000.0 AS rank
-                    FROM munros m
-                    {" ".join(joins2) if joins2 else ""}
-                    WHERE {" AND ".join(wheres2)}
-                    {exclude_sql2}
-                    GROUP BY m.id
-                    {having2}
-                    ORDER BY m.name ASC
-                    LIMIT ?
-                """
-                params_like = where_params2 + exclude_params2 + having_params2 + [limit]
-                rows = c.execute(sql_like, params_like).fetchall()
-                used_sql, used_params = sql_like, params_like
-
-        # ---------- Pass 3: Tag-only fallback ----------
-        if not rows and include_tags:
-            joins3 = ["JOIN munro_tags t_in ON t_in.munro_id = m.id"]
-            wheres3, where_params3 = ["1=1"], []
-
-            # Numeric filters (WHERE first)
-            if bog_max is not None:
-                wheres3.append("(m.bog IS NULL OR m.bog <= ?)")
-                where_params3.append(bog_max)
-            if grade_max is not None:
-                wheres3.append("(m.grade IS NULL OR m.grade <= ?)")
-                where_params3.append(grade_max)
-            _add_numeric_filters(
-                wheres3, where_params3, dist_min, dist_max, time_min, time_max
-            )
-
-            having3 = (
-                f"HAVING COUNT(DISTINCT CASE WHEN t_in.tag IN ({','.join('?' for _ in include_tags)}) "
-                f"THEN t_in.tag END) = ?"
-            )
-            having_params3 = include_tags[:] + [len(include_tags)]
-
-            exclude_sql3, exclude_params3 = "", []
-            if exclude_tags:
-                exclude_sql3 = f"""
-                    AND m.id NOT IN (
-                        SELECT munro_id FROM munro_tags
-                        WHERE tag IN ({",".join("?" for _ in exclude_tags)})
-                    )
-                """
-                exclude_params3 = exclude_tags[:]
-
-            sql_tags = f"""
-                SELECT m.id, m.name, m.summary, m.description,
-                       2000.0 AS rank
-                FROM munros m
-                {" ".join(joins3)}
-                WHERE {" AND ".join(wheres3)}
-                {exclude_sql3}
-                GROUP BY m.id
-                {having3}
-                ORDER BY m.name ASC
-                LIMIT ?
-            """
-            params_tags = where_params3 + exclude_params3 + having_params3 + [limit]
-            rows = c.execute(sql_tags, params_tags).fetchall()
-            used_sql, used_params = sql_tags, params_tags
-
-        # ---------- Attach tags ----------
-        ids = [r["id"] for r in rows]
-        tags_map: Dict[int, List[str]] = {}
-        if ids:
-            tag_rows = c.execute(
-                f"SELECT munro_id, tag FROM munro_tags WHERE munro_id IN ({','.join('?' for _ in ids)})",
-                ids,
-            ).fetchall()
-            for tr in tag_rows:
-                tags_map.setdefault(tr["munro_id"], []).append(tr["tag"])
-
-        results = [
-            {
-                "id": r["id"],
-                "name": r["name"],
-                "summary": r["summary"],
-                "snippet": (r["description"] or "")[:400],
-                "tags": sorted(tags_map.get(r["id"], [])),
-                "rank": r["rank"],
-            }
-            for r in rows
-        ]
+    # The SQL text depends only on which filters are present, so it is cached by shape.
+    numeric = _numeric_shape(dist_min, dist_max, time_min, time_max)
+    shape = (
+        min(len(include_tags), 2),
+        bool(exclude_tags),
+        bog_max is not None,
+        grade_max is not None,
+        numeric,
+    )
 
+    # Filter parameters shared by every pass, in _build_filters placeholder order.
+    bound_params: List[Any] = []
+    if exclude_tags:
+        bound_params.append(json.dumps(exclude_tags))
+    if len(include_tags) == 1:
+        bound_params.append(include_tags[0])
+    elif include_tags:
+        bound_params.extend([json.dumps(include_tags), len(include_tags)])
+    if bog_max is not None:
+        bound_params.append(bog_max)
+    if grade_max is not None:
+        bound_params.append(grade_max)
+    numeric_values = (dist_min, dist_max, time_min, time_max)
+    bound_params.extend(float(v) for v, on in zip(numeric_values, numeric) if on)
+
+    conn = get_db()
+    fts_query = expand_query_for_fts(raw_query)
+
+    # Tag order does not change the result set; the catalog version drops stale entries.
+    cache_key = (
+        catalog_version(),
+        raw_query,
+        tuple(sorted(include_tags)),
+        tuple(sorted(exclude_tags)),
+        bog_max,
+        grade_max,
+        tuple(bound_params),
+        limit,
+    )
+    try:
+        hit = _cached_search(cache_key)
+    except TypeError:
+        # Unhashable filter values from a malformed payload; just skip the cache.
+        cache_key, hit = None, None
+    if hit is not None:
         return {
             "query": raw_query,
             "fts_query": fts_query,
@@ -291,67 +330,203 @@ def search_core(payload: Dict[str, Any]) -> Dict[str, Any]:
             "exclude_tags": exclude_tags,
             "bog_max": bog_max,
             "grade_max": grade_max,
-            "sql": used_sql,
-            "params": used_params,
-            "results": results,
+            "sql": hit[1],
+            "params": list(hit[2]),
+            "results": [dict(r) for r in hit[3]],
+            "context": hit[4],
+        }
+
+    # Passes: 1) FTS ranked by bm25, 2) trigram substring, 3) tag-only.
+    trigram_query = build_trigram_query(raw_query) if raw_query else ""
+    # Outer filters may drop FTS hits, so only cap the inner scan when unfiltered.
+    unfiltered = shape == (0, False, False, False, (False,) * 4)
+
+    def run(use_fts: bool):
+        passes = (use_fts, bool(trigram_query), bool(include_tags))
+        if not any(passes):
+            return "", [], []
+        params: List[Any] = []
+        if use_fts:
+            params += [fts_query, limit if unfiltered else -1, *bound_params, limit]
+        if trigram_query:
+            params += [trigram_query, *bound_params, limit]
+        if include_tags:
+            params += [*bound_params, limit]
+        sql = _build_search_sql(passes, *shape)
+        return sql, params, conn.execute(sql, params).fetchall()
+
+    try:
+        used_sql, used_params, rows = run(bool(fts_query))
+    except sqlite3.OperationalError as e:
+        # A MATCH the FTS5 parser still rejects: rerun without the FTS pass.
+        if not fts_query or "fts5" not in str(e):
+            raise
+        logger.warning("FTS query %r rejected: %s", fts_query, e)
+        used_sql, used_params, rows = run(False)
+
+    results = [
+        {
+            "id": r["id"],
+            "name": r["name"],
+            "summary": r["summary"],
+            "snippet": (r["description"] or "")[:400],
+            "tags": sorted(r["_tags_packed"].split("\x1f")) if r["_tags_packed"] else [],
+            "rank": r["rank"],
+        }
+        for r in rows
+    ]
+    context = format_context(results)
+    if cache_key is not None:
+        _store_search(cache_key, used_sql, used_params, results, context)
+        results = [dict(r) for r in results]
+
+    return {
+        "query": raw_query,
+        "fts_query": fts_query,
+        "include_tags": include_tags,
+        "exclude_tags": exclude_tags,
+        "bog_max": bog_max,
+        "grade_max": grade_max,
+        "sql": used_sql,
+        "params": used_params,
+        "results": results,
+        "context": context,
+    }
+
+
+# ---------- Direct name lookup ----------
+
+# Phrase match on the name column; a few rows are enough to tell a unique hit.
+_NAME_LOOKUP_SQL = f"""
+    SELECT m.id, m.name, m.summary, m.description,
+           COALESCE(bm25(munro_fts, {_FTS_WEIGHTS}), 0.0) AS rank, {_TAGS_PACKED}
+    FROM munro_fts
+    JOIN munros m ON m.id = munro_fts.rowid
+    WHERE munro_fts MATCH ?
+    ORDER BY rank
+    LIMIT 8
+"""
+# Trailing qualifier such as "(An Teallach)" or "(Nevis Range)".
+_NAME_QUALIFIER = re.compile(r"\s*\([^)]*\)\s*$")
+_NAME_WORDS = re.compile(r"[a-z0-9]+")
+
+
+def _name_key(name: str) -> str:
+    """Fold a name to lowercase ASCII words, ignoring punctuation."""
+
+    return " ".join(_NAME_WORDS.findall(norm_text(name)))
+
+
+def find_munro_by_name(phrase: str) -> Optional[Dict[str, Any]]:
+    """Return a search response when ``phrase`` names exactly one Munro, else ``None``.
+
+    The FTS phrase hit is confirmed against the folded name (qualifier optional),
+    so partial or shared names fall through to the normal search.
+    """
+
+    folded = _name_key(phrase)
+    if len(folded) < 3:
+        return None
+    match = 'name : "' + phrase.replace('"', '""') + '"'
+    try:
+        rows = get_db().execute(_NAME_LOOKUP_SQL, (match,)).fetchall()
+    except sqlite3.OperationalError:
+        return None
+    hits = [
+        r for r in rows
+        if folded in (_name_key(r["name"]), _name_key(_NAME_QUALIFIER.sub("", r["name"])))
+    ]
+    if len(hits) != 1:
+        return None
+    r = hits[0]
+    results = [
+        {
+            "id": r["id"],
+            "name": r["name"],
+            "summary": r["summary"],
+            "snippet": (r["description"] or "")[:400],
+            "tags": sorted(r["_tags_packed"].split("\x1f")) if r["_tags_packed"] else [],
+            "rank": r["rank"],
         }
+    ]
+    return {
+        "query": phrase,
+        "fts_query": match,
+        "include_tags": [],
+        "exclude_tags": [],
+        "bog_max": None,
+        "grade_max": None,
+        "sql": _NAME_LOOKUP_SQL,
+        "params": [match],
+        "results": results,
+        "context": format_context(results),
+        "retrieval_mode": "name",
+    }
 
 
 # ---------- Compact dataset & LLM helpers ----------
 
+# Trimming and NULL handling happen in SQL so rows map straight onto the slice dicts.
+_DATASET_SLICE_COLS = ("id", "name", "summary", "terrain", "transport", "start", "tags")
+_DATASET_SLICE_SQL = """
+    SELECT id, name,
+           CASE WHEN length(summary) > 220 THEN substr(summary, 1, 220) || '…'
+                ELSE COALESCE(summary, '') END,
+           COALESCE(terrain, ''),
+           COALESCE(public_transport, ''),
+           COALESCE(start, ''),
+           tags
+    FROM munro_summary
+    ORDER BY name ASC
+    LIMIT ?
+"""
+
 
 def compact_dataset_slice(limit_items=200) -> list[dict]:
     """Return a trimmed dataset view used for broad LLM retrieval."""
 
-    with get_db() as conn:
-        rows = conn.execute(
-            """
-            SELECT m.id, m.name, m.summary, m.terrain, m.public_transport, m.start,
-                   COALESCE(GROUP_CONCAT(t.tag, '|'), '') AS tags
-            FROM munros m
-            LEFT JOIN munro_tags t ON t.munro_id = m.id
-            GROUP BY m.id
-            ORDER BY m.name ASC
-            LIMIT ?
-        """,
-            (limit_items,),
-        ).fetchall()
-    data = []
-    for r in rows:
-        tags = (r["tags"] or "").replace("|", ", ")
-        summ = r["summary"] or ""
-        if len(summ) > 220:
-            summ = summ[:220] + "…"
-        data.append(
-            {
-                "id": r["id"],
-                "name": r["name"],
-                "summary": summ,
-                "terrain": r["terrain"] or "",
-                "transport": r["public_transport"] or "",
-                "start": r["start"] or "",
-                "tags": tags,
-            }
-        )
-    return data
+    rows = get_db().execute(_DATASET_SLICE_SQL, (limit_items,)).fetchall()
+    return [dict(zip(_DATASET_SLICE_COLS, r)) for r in rows]
 
 
 def format_compact_lines(data: list[dict], cap=120) -> str:
     """Format dataset rows into markdown-style bullets for prompting."""
 
-    lines = []
-    for item in data[:cap]:
-        line = f"- {item['name']} | tags: {item['tags']} | terrain: {item['terrain']} | transport: {item['transport']} | start: {item['start']} | {item['summary']}"
-        lines.append(line)
-    return "\n".join(lines)
+    return "\n".join(
+        f"- {item['name']} | tags: {item['tags']} | terrain: {item['terrain']} | transport: {item['transport']} | start: {item['start']} | {item['summary']}"
+        for item in data[:cap]
+    )
+
+
+@lru_cache(maxsize=4)
+def _dataset_summary(version, limit_items: int, cap: int) -> str:
+    """Formatted dataset lines for one catalog version."""
+
+    return format_compact_lines(compact_dataset_slice(limit_items), cap=cap)
+
+
+def dataset_summary(limit_items=250, cap=120) -> str:
+    """Return the broad-fallback dataset lines, rebuilt only when the catalog changes."""
+
+    return _dataset_summary(catalog_version(), limit_items, cap)
+
 
+def pick_route_names_llm(dataset_lines: str, user_msg: str) -> Optional[list[str]]:
+    """Use the LLM to pick plausible route names from a text summary.
 
-def pick_route_names_llm(dataset_lines: str, user_msg: str) -> list[str]:
-    """Use the LLM to pick plausible route names from a text summary."""
+    Returns ``None`` when the LLM call or its JSON fails, so callers can tell a
+    transient failure from a genuine "no matches".
+    """
 
-    llm, use_llm = get_llm()
-    if not use_llm:
+    llm = get_json_llm()
+    if llm is None:
         return []
+    pick_key = cache_key(
+        "pick", current_app.config.get("MUNRO_CHAT_MODEL"), dataset_lines, user_msg
+    )
+    cached = get_cached(pick_key)
+    if cached is not None:
+        return cached
     prompt = f"""
 From the dataset lines below, pick up to 6 route *names* that best match the user's request.
 
@@ -376,19 +551,45 @@ Dataset lines:
             ]
         ).content.strip()
     except Exception:
-        logger.exception("[search_service] broad LLM pick failed; returning no matches")
-        return []
+        logger.exception("[search_service] broad LLM pick failed")
+        return None
 
-    import json
+    obj = parse_json_object(raw)
+    names = obj.get("names") if obj else None
+    if not isinstance(names, list):
+        logger.warning("[search_service] failed to parse broad LLM JSON response: %r", raw[:200])
+        return None
+    names = [n for n in names if isinstance(n, str) and n.strip()][:6]
+    store(pick_key, names)
+    return names
 
-    try:
-        obj = json.loads(raw)
-        names = obj.get("names") or []
-        names = [n for n in names if isinstance(n, str) and n.strip()]
-        return names[:6]
-    except Exception:
-        logger.exception("[search_service] failed to parse broad LLM JSON response")
-        return []
+
+@lru_cache(maxsize=1)
+def _name_indexes(version) -> Tuple[Dict[str, int], Dict[str, int], Dict[int, str]]:
+    """Build exact/loose name -> id maps and id -> name for one catalog version."""
+
+    rows = get_db().execute("SELECT id, name FROM munros").fetchall()
+    idx_exact = {r["name"]: r["id"] for r in rows}
+    idx_loose = {norm_text(r["name"]): r["id"] for r in rows}
+    id_to_name = {r["id"]: r["name"] for r in rows}
+    return idx_exact, idx_loose, id_to_name
+
+
+@lru_cache(maxsize=1)
+def _tag_map(version) -> Dict[int, Tuple[str, ...]]:
+    """Build munro id -> sorted tags for one catalog version."""
+
+    rows = get_db().execute(
+        "SELECT munro_id, GROUP_CONCAT(tag, char(31)) FROM munro_tags GROUP BY munro_id"
+    ).fetchall()
+    return {mid: tuple(sorted(tags.split("\x1f"))) for mid, tags in rows}
+
+
+def tags_for_ids(ids: List[int]) -> Dict[int, List[str]]:
+    """Return sorted tags per id from the in-process tag map (no query per call)."""
+
+    tmap = _tag_map(catalog_version())
+    return {i: list(tmap.get(i, ())) for i in ids}
 
 
 def names_to_ids(names: list[str]) -> list[dict]:
@@ -396,28 +597,24 @@ def names_to_ids(names: list[str]) -> list[dict]:
 
     if not names:
         return []
-    with get_db() as conn:
-        all_rows = conn.execute("SELECT id, name FROM munros").fetchall()
-        idx_exact = {r["name"]: r["id"] for r in all_rows}
-        idx_loose = {norm_text(r["name"]): r["id"] for r in all_rows}
-
-        out = []
-        for n in names:
-            if n in idx_exact:
-                out.append({"id": idx_exact[n], "name": n})
-                continue
-            nid = idx_loose.get(norm_text(n))
-            if nid:
-                dbname = next(row["name"] for row in all_rows if row["id"] == nid)
-                out.append({"id": nid, "name": dbname})
-                continue
-            row2 = conn.execute(
-                "SELECT id, name FROM munros WHERE name LIKE ? COLLATE NOCASE LIMIT 1",
-                (f"%{n}%",),
-            ).fetchone()
-            if row2:
-                out.append({"id": row2["id"], "name": row2["name"]})
-        return out
+    idx_exact, idx_loose, id_to_name = _name_indexes(catalog_version())
+
+    out = []
+    for n in names:
+        if n in idx_exact:
+            out.append({"id": idx_exact[n], "name": n})
+            continue
+        nid = idx_loose.get(norm_text(n))
+        if nid:
+            out.append({"id": nid, "name": id_to_name[nid]})
+            continue
+        row2 = get_db().execute(
+            "SELECT id, name FROM munros WHERE name LIKE ? COLLATE NOCASE LIMIT 1",
+            (f"%{n}%",),
+        ).fetchone()
+        if row2:
+            out.append({"id": row2["id"], "name": row2["name"]})
+    return out
 
 
 # ---------- Location-first search (distance-weighted) ----------
@@ -431,16 +628,19 @@ def search_by_location_core(
     distance_max_km: Optional[float] = None,
     time_min_h: Optional[float] = None,
     time_max_h: Optional[float] = None,
+    resolved: Optional[Tuple[float, float, str]] = None,
 ) -> Dict[str, Any]:
     """
     Location-first search: nearest Munros to the specified place.
+    ``resolved`` (lat, lon, query) skips geocoding when the caller already has it;
+    ``geo_service.LOCATION_MISS`` reports a known miss without geocoding again.
     Semantics: proximity is primary; tags are a soft boost.
     Applies HARD numeric filters on route attributes if available.
     """
     include_tags = include_tags or []
 
     # 1) Distance candidates (raises ValueError if location not in Scotland)
-    near = nearest_by_location(location_query=location, k=max(20, limit))
+    near = nearest_by_location(location_query=location, k=max(20, limit), resolved=resolved)
 
     # 2) Map to DB rows & tags (rows contain: id, name, summary, description,
     #    distance_km [to user], and if available route_distance, route_time)
@@ -509,6 +709,7 @@ def search_by_location_core(
         "sql": "[location-mode: distance rank]",
         "params": [location],
         "results": results,
+        "context": format_context(results, with_distance=True),
         "location": location,
         "retrieval_mode": "location",
     }
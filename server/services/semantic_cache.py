@@ -0,0 +1,66 @@
+import threading
+import time
+from typing import Any, Callable, Hashable, List, Optional, Sequence
+import numpy as np
+
+
+class SemanticCache:
+    """Reply cache matched by cosine similarity of message embeddings (LRU-evicted)."""
+
+    def __init__(
+        self,
+        embed: Callable[[str], Sequence[float]],
+        threshold: float = 0.92,
+        maxsize: int = 256,
+        ttl: float = 3600,
+    ):
+        self.embed_fn = embed
+        self.threshold = threshold
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        # Row i of _vecs is slot i's L2-normalised embedding; allocated on first add.
+        self._vecs: Optional[np.ndarray] = None
+        self._scopes: List[Optional[Hashable]] = [None] * maxsize
+        self._payloads: List[Any] = [None] * maxsize
+        self._expires = np.zeros(maxsize, dtype=np.float64)
+        self._last_used = np.zeros(maxsize, dtype=np.int64)
+        self._tick = 0
+
+    def embed(self, text: str) -> np.ndarray:
+        """Embed ``text`` as a unit-length float32 vector."""
+
+        vec = np.asarray(self.embed_fn(text), dtype=np.float32)
+        norm = float(np.linalg.norm(vec))
+        return vec / norm if norm else vec
+
+    def lookup(self, vec: np.ndarray, scope: Hashable) -> Optional[Any]:
+        """Return the payload of the most similar live entry in ``scope``, if close enough."""
+
+        with self._lock:
+            if self._vecs is None:
+                return None
+            sims = self._vecs @ vec  # one GEMV over every slot
+            live = self._expires > time.monotonic()
+            live &= np.fromiter((s == scope for s in self._scopes), bool, self.maxsize)
+            sims[~live] = -1.0
+            i = int(np.argmax(sims))
+            if sims[i] < self.threshold:
+                return None
+            self._tick += 1
+            self._last_used[i] = self._tick
+            return self._payloads[i]
+
+    def add(self, vec: np.ndarray, scope: Hashable, payload: Any) -> None:
+        """Remember ``payload`` for ``vec``, replacing the least recently used slot."""
+
+        with self._lock:
+            if self._vecs is None:
+                self._vecs = np.zeros((self.maxsize, vec.size), dtype=np.float32)
+            i = int(np.argmin(self._last_used))  # empty slots (0) are filled first
+            self._vecs[i] = vec
+            self._scopes[i] = scope
+            self._payloads[i] = payload
+            self._expires[i] = time.monotonic() + self.ttl
+            self._tick += 1
+            self._last_used[i] = self._tick
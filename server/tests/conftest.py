@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Server modules import each other top-level ("from db import ..."), as under gunicorn.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,40 @@
+from routes.chat import extract_location_heuristic, semantic_facets
+from utils.filters import parse_numeric_filters
+
+
+def facets(message):
+    """Semantic-cache facets for ``message``, built as the chat route builds them."""
+
+    return semantic_facets(
+        message, extract_location_heuristic(message), parse_numeric_filters(message)
+    )
+
+
+def test_distance_bounds_never_share_a_scope():
+    assert facets("scrambles under 10 km near Aviemore") != facets(
+        "scrambles under 25 km near Aviemore"
+    )
+
+
+def test_time_bounds_never_share_a_scope():
+    assert facets("ridge walks under 5 hours near Aviemore") != facets(
+        "ridge walks under 8 hours near Aviemore"
+    )
+
+
+def test_with_and_without_a_tag_never_share_a_scope():
+    with_tag = facets("ridge walks near Aviemore with scrambles")
+    without_tag = facets("ridge walks near Aviemore without scrambles")
+    assert with_tag != without_tag
+    assert with_tag[1:3] == (("ridge", "scramble"), ())
+    assert without_tag[1:3] == (("ridge",), ("scramble",))
+
+
+def test_other_places_never_share_a_scope():
+    assert facets("easy munros near Fort William") != facets("easy munros near Aviemore")
+
+
+def test_paraphrases_share_a_scope():
+    assert facets("easy munros near Fort William") == facets(
+        "show me some easy hills near Fort William"
+    )
@@ -0,0 +1,116 @@
+import hashlib
+import threading
+import time
+from functools import wraps
+from typing import Dict, Iterable, Iterator, Tuple
+from urllib.parse import urlencode
+from flask import current_app, request
+from db import catalog_version, get_db
+
+_MAX_ENTRIES = 256
+
+# Bumped by write paths so every previously cached body is ignored.
+_generation = 0
+_lock = threading.Lock()
+# key -> (expires_at, body, content_type)
+_store: Dict[bytes, Tuple[float, bytes, str]] = {}
+
+
+def invalidate_responses() -> None:
+    """Drop all cached responses (call after any write to the catalog)."""
+
+    global _generation
+    with _lock:
+        _generation += 1
+        _store.clear()
+
+
+def _request_key() -> bytes:
+    """Hash the catalog version, request path and canonicalised (sorted) query arguments."""
+
+    args = urlencode(sorted(request.args.items(multi=True)))
+    # catalog_version() keeps a reseed from serving old bodies under the new ETag.
+    raw = f"{_generation}|{catalog_version()}|{request.path}?{args}".encode("utf-8")
+    return hashlib.blake2b(raw, digest_size=16).digest()
+
+
+def _remember(key: bytes, entry: Tuple[float, str], body: bytes) -> None:
+    """Store ``body`` under ``key``, evicting the oldest entry when full."""
+
+    with _lock:
+        # Insertion-ordered dict: evict the oldest entry when full.
+        if len(_store) >= _MAX_ENTRIES:
+            _store.pop(next(iter(_store)), None)
+        _store[key] = (entry[0], body, entry[1])
+
+
+def _tee(chunks: Iterable[bytes], key: bytes, entry: Tuple[float, str]) -> Iterator[bytes]:
+    """Pass streamed chunks through and cache the body if it completes."""
+
+    seen = []
+    try:
+        for chunk in chunks:
+            seen.append(chunk)
+            yield chunk
+        _remember(key, entry, b"".join(seen))
+    finally:
+        close = getattr(chunks, "close", None)
+        if close is not None:
+            close()
+
+
+def cached_json(ttl: int = 300):
+    """Cache successful response bodies of an idempotent GET view for ``ttl`` seconds."""
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            key = _request_key()
+            now = time.monotonic()
+            hit = _store.get(key)
+            if hit is not None and hit[0] > now:
+                return current_app.response_class(hit[1], content_type=hit[2])
+
+            resp = current_app.make_response(view(*args, **kwargs))
+            if resp.status_code == 200:
+                entry = (now + ttl, resp.content_type)
+                if resp.is_streamed:
+                    # Don't buffer a streamed body up front; store it once fully sent.
+                    resp.response = _tee(resp.response, key, entry)
+                else:
+                    _remember(key, entry, resp.get_data())
+            return resp
+
+        return wrapper
+
+    return decorator
+
+
+def catalog_etag() -> str:
+    """Validator for catalog-derived responses; changes whenever the database does."""
+
+    get_db()  # opening the connection may create the WAL file, so do it first
+    raw = repr((catalog_version(), _generation)).encode("utf-8")
+    return hashlib.blake2b(raw, digest_size=12).hexdigest()
+
+
+def catalog_conditional(max_age: int = 300):
+    """Tag 200 responses with the catalog ETag and answer a matching ``If-None-Match`` with 304."""
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            etag = catalog_etag()
+            if request.if_none_match.contains_weak(etag):
+                resp = current_app.response_class(status=304)
+            else:
+                resp = current_app.make_response(view(*args, **kwargs))
+                if resp.status_code != 200:
+                    return resp
+            resp.set_etag(etag, weak=True)
+            resp.cache_control.max_age = max_age
+            return resp
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,85 @@
+import re
+from typing import Any, Dict, Optional
+import orjson
+
+_FENCE = re.compile(r"^\s*```(?:json)?|```\s*$", re.IGNORECASE)
+_WORD = re.compile(r"[A-Za-z_]+")
+# Python literals LLMs sometimes emit in place of JSON ones.
+_PY_LITERALS = {"None": "null", "True": "true", "False": "false"}
+
+
+def _drop_trailing_comma(out: list) -> None:
+    """Remove a dangling ``,`` (and whitespace after it) from the end of ``out``."""
+
+    j = len(out)
+    while j and out[j - 1].isspace():
+        j -= 1
+    if j and out[j - 1] == ",":
+        del out[j - 1:]
+
+
+def _repair(raw: str) -> str:
+    """Rewrite near-JSON into JSON in one pass over the first ``{...}`` object.
+
+    Strips code fences and surrounding prose, maps Python literals, drops trailing
+    commas and closes a truncated object's open strings and brackets.
+    """
+
+    text = _FENCE.sub("", raw.strip())
+    i = text.find("{")
+    if i < 0:
+        return text
+    out: list = []
+    closers: list = []
+    in_str = False
+    n = len(text)
+    while i < n:
+        c = text[i]
+        if in_str:
+            out.append(c)
+            if c == "\\" and i + 1 < n:
+                out.append(text[i + 1])
+                i += 1
+            elif c == '"':
+                in_str = False
+        elif c == '"':
+            in_str = True
+            out.append(c)
+        elif c == "{" or c == "[":
+            closers.append("}" if c == "{" else "]")
+            out.append(c)
+        elif c == "}" or c == "]":
+            _drop_trailing_comma(out)
+            out.append(c)
+            if closers:
+                closers.pop()
+            if not closers:
+                break  # end of the outermost object; ignore trailing prose
+        elif c.isalpha() or c == "_":
+            word = _WORD.match(text, i).group(0)
+            out.append(_PY_LITERALS.get(word, word))
+            i += len(word)
+            continue
+        else:
+            out.append(c)
+        i += 1
+    if in_str:
+        out.append('"')
+    _drop_trailing_comma(out)
+    out.extend(reversed(closers))
+    return "".join(out)
+
+
+def parse_json_object(raw: str) -> Optional[Dict[str, Any]]:
+    """Parse a JSON object from an LLM reply, or return ``None`` if there isn't one."""
+
+    if not raw:
+        return None
+    try:
+        obj = orjson.loads(raw)
+    except orjson.JSONDecodeError:
+        try:
+            obj = orjson.loads(_repair(raw))
+        except orjson.JSONDecodeError:
+            return None
+    return obj if isinstance(obj, dict) else None
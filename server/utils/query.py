@@ -1,7 +1,15 @@
 import re, unicodedata
-from typing import List, Dict
+from functools import lru_cache
+from typing import Dict, List, Tuple
 
-STOPWORDS = {
+# Word boundaries for query tokens; apostrophes stay inside words (e.g. "a'").
+_TOKEN_RE = re.compile(r"[^\w']+")
+# ASCII equivalent of _TOKEN_RE: every non-word, non-apostrophe byte becomes a space.
+_ASCII_SEPARATORS = str.maketrans(
+    {chr(c): " " for c in range(128) if not (chr(c).isalnum() or chr(c) in "_'")}
+)
+
+STOPWORDS = frozenset({
     "the",
     "a",
     "an",
@@ -32,16 +40,36 @@ STOPWORDS = {
     "give",
     "list",
     "me",
+})
+
+_SYNONYMS_SRC: Dict[str, Tuple[str, ...]] = {
+    "scramble": ("scramble", "scrambling"),
+    "scrambles": ("scramble", "scrambling"),
+    "airy": ("airy", "exposed", "exposure"),
+    "bus": ("bus", "buses"),
+    "train": ("train", "rail", "railway", "station"),
 }
-
-GENERIC_SYNONYMS: Dict[str, list[str]] = {
-    "scramble": ["scramble", "scrambling"],
-    "scrambles": ["scramble", "scrambling"],
-    "airy": ["airy", "exposed", "exposure"],
-    "bus": ["bus", "buses"],
-    "train": ["train", "rail", "railway", "station"],
+# Lowercased once at import so lookups match tokenize() output directly.
+GENERIC_SYNONYMS: Dict[str, Tuple[str, ...]] = {
+    k.lower(): tuple(v.lower() for v in vals) for k, vals in _SYNONYMS_SRC.items()
 }
 
+def _build_ascii_fold() -> Dict[int, str]:
+    """Map Latin-1/Latin Extended-A letters to the ASCII part of their NFKD form."""
+
+    table = {ord(c): "'" for c in "’‘`"}
+    for cp in range(0xA0, 0x180):
+        ch = chr(cp)
+        table[cp] = (
+            unicodedata.normalize("NFKD", ch).encode("ascii", "ignore").decode("ascii")
+        )
+    return table
+
+
+# Precomputed equivalent of NFKD + ASCII-drop for the characters Munro names use
+# (plus apostrophe variants), so norm_text rarely needs unicodedata at call time.
+_ASCII_FOLD = _build_ascii_fold()
+
 DIFF_WORD_TO_NUM = {
     "easy": 3,
     "moderate": 4,
@@ -53,57 +81,67 @@ DIFF_WORD_TO_NUM = {
 def tokenize(q: str) -> List[str]:
     """Split a query string into lowercase tokens while keeping apostrophes."""
 
-    return [t for t in re.split(r"[^\w']+", (q or "").lower()) if t]
+    if not q:
+        return []
+    if q.isascii():
+        return q.lower().translate(_ASCII_SEPARATORS).split()
+    return list(filter(None, _TOKEN_RE.split(q.lower())))
 
 
-def quote_or_prefix(term: str) -> str:
-    """Return a quoted phrase or wildcard prefix suitable for FTS MATCH."""
+def _query_key(q: str) -> str:
+    """Canonical cache key: tokenization ignores case and runs of whitespace."""
 
-    if " " in term:
-        return f'"{term}"'
-    return f"{term[:5]}*" if len(term) >= 5 else term
+    return " ".join(q.lower().split()) if q else ""
 
 
 def expand_query_for_fts(q: str) -> str:
     """Normalise a free text query into an FTS expression with synonyms."""
 
+    return _expand_query_for_fts(_query_key(q))
+
+
+@lru_cache(maxsize=2048)
+def _expand_query_for_fts(q: str) -> str:
+    """Memoised body of :func:`expand_query_for_fts` for a canonical query."""
+
     toks = tokenize(q)
     candidates: list[str] = []
     for t in toks:
         if t in STOPWORDS:
             continue
-        candidates.extend(GENERIC_SYNONYMS.get(t, [t]))
+        candidates.extend(GENERIC_SYNONYMS.get(t) or (t,))
+
+    # Every term is quoted so FTS5 never parses user text as operators (tokens can't
+    # contain '"'). ASCII words of 5+ chars become a 5-char prefix; apostrophe words
+    # ("don't") split into several FTS tokens, so they are matched as exact phrases.
+    # Dedupe the final terms: synonyms often collapse to one prefix ("scram"*).
+    terms = dict.fromkeys(
+        f'"{s[:5]}"*' if len(s) >= 5 and s.isascii() and "'" not in s else f'"{s}"'
+        for s in candidates
+    )
+    return " OR ".join(terms)
+
 
-    seen, cleaned = set(), []
-    for s in candidates:
-        s = s.strip()
-        k = s.lower()
-        if s and k not in seen:
-            seen.add(k)
-            cleaned.append(s)
+def build_trigram_query(q: str) -> str:
+    """Build a trigram FTS MATCH expression (with synonyms) for substring search."""
 
-    terms = [quote_or_prefix(s) for s in cleaned]
-    return " OR ".join(terms) if terms else ""
+    return _build_trigram_query(_query_key(q))
 
 
-def build_like_terms(q: str) -> list[str]:
-    """Generate SQL LIKE patterns (with synonyms) for fallback search passes."""
+@lru_cache(maxsize=2048)
+def _build_trigram_query(q: str) -> str:
+    """Memoised body of :func:`build_trigram_query` for a canonical query."""
 
     toks = tokenize(q)
     expanded: list[str] = []
     for t in toks:
         if t in STOPWORDS:
             continue
-        expanded.extend(GENERIC_SYNONYMS.get(t, [t]))
+        expanded.extend(GENERIC_SYNONYMS.get(t) or (t,))
 
-    seen, out = set(), []
-    for t in expanded:
-        t = t.strip()
-        k = t.lower()
-        if t and k not in seen:
-            seen.add(k)
-            out.append(f"%{t}%")
-    return out[:12]
+    # The trigram tokenizer cannot match substrings shorter than 3 characters.
+    terms = list(dict.fromkeys(t for t in expanded if len(t) >= 3))
+    return " OR ".join(f'"{t}"' for t in terms[:12])
 
 
 def normalize_grade_max(value):
@@ -129,7 +167,10 @@ def norm_text(s: str) -> str:
 
     if not s:
         return ""
-    s = s.replace("’", "'").replace("‘", "'").replace("`", "'")
+    # Names are ASCII or Latin-1/Extended-A once folded; NFKD only for anything rarer.
+    s = s.translate(_ASCII_FOLD)
+    if s.isascii():
+        return s.lower().strip()
     s = unicodedata.normalize("NFKD", s)
     s = s.encode("ascii", "ignore").decode("ascii")
     return s.lower().strip()